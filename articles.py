@@ -5,10 +5,21 @@ from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 import re
 from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import requests
 
 
+# Query parameters that only track the click, not the content
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid"})
+_TITLE_WORD_RE = re.compile(r"[a-z0-9]+")
+# Titles sharing this many leading words are treated as the same story
+_TITLE_KEY_WORDS = 8
+# Shorter titles ("Weekend Baking Links") recur across different stories,
+# so they only ever match by URL
+_TITLE_MIN_WORDS = 5
+
+
 @dataclass(frozen=True)
 class Article:
     title: str
@@ -94,14 +105,62 @@ def fetch_rss_articles(
     return items
 
 
-def _dedupe_by_url(articles: Iterable[Article]) -> list[Article]:
-    seen: set[str] = set()
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL for duplicate detection: lowercase scheme and host, drop
+    tracking query params (utm_*, fbclid, ...), the fragment and any
+    trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def _title_key(title: str) -> str:
+    """Leading words of title, or "" when it's too short to identify a story."""
+    words = _TITLE_WORD_RE.findall(title.lower())
+    if len(words) < _TITLE_MIN_WORDS:
+        return ""
+    return " ".join(words[:_TITLE_KEY_WORDS])
+
+
+def _published_key(a: Article) -> str:
+    # Unknown dates sort after every ISO-8601 timestamp
+    return a.published_at or "~"
+
+
+def dedupe_articles(articles: Iterable[Article]) -> list[Article]:
+    """
+    Collapse duplicate stories in a single pass.
+
+    Articles are duplicates when their canonical URLs match or their titles
+    share the same leading words (titles of at least _TITLE_MIN_WORDS words). Each group keeps the earliest-published
+    copy, in the position where the group was first seen.
+    """
     out: list[Article] = []
+    slot_by_key: dict[str, int] = {}
+
     for a in articles:
-        if a.url in seen:
-            continue
-        seen.add(a.url)
-        out.append(a)
+        keys = [canonical_url(a.url)]
+        title_key = _title_key(a.title)
+        if title_key:
+            keys.append("title:" + title_key)
+
+        slot = next((slot_by_key[k] for k in keys if k in slot_by_key), None)
+        if slot is None:
+            slot = len(out)
+            out.append(a)
+        elif _published_key(a) < _published_key(out[slot]):
+            out[slot] = a
+
+        for k in keys:
+            slot_by_key.setdefault(k, slot)
+
     return out
 
 
@@ -123,7 +182,7 @@ def get_top_baking_articles(*, limit: int = 5) -> list[Article]:
             # Best-effort: skip failing feeds (network issues, rate limits, etc.)
             continue
 
-    all_articles = _dedupe_by_url(all_articles)
+    all_articles = dedupe_articles(all_articles)
 
     def sort_key(a: Article) -> tuple[int, str]:
         # Newest first; unknown dates go last.
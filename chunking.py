@@ -7,8 +7,10 @@ Provides multiple chunking strategies:
 - Sentence count
 """
 import re
-from typing import List, Literal
-from dataclasses import dataclass
+import hashlib
+from functools import lru_cache
+from typing import List, Literal, Tuple
+from dataclasses import dataclass, replace
 
 
 @dataclass
@@ -52,16 +54,88 @@ def chunk_document(
     if not text or not text.strip():
         return []
     
+    # Chunks are mutable (the hybrid strategy renumbers them), so hand out copies
+    cached = _chunk_cached(_HashedText(text), strategy, chunk_size, overlap)
+    return [replace(chunk, metadata=dict(chunk.metadata)) for chunk in cached]
+
+
+class _HashedText:
+    """
+    Cache key for a document: hashes and compares by digest, so a cache hit
+    doesn't compare the whole text, while still carrying the text itself.
+    """
+    __slots__ = ("text", "digest")
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def __hash__(self) -> int:
+        return hash(self.digest)
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _HashedText) and self.digest == other.digest
+
+
+@lru_cache(maxsize=16)
+def _chunk_cached(
+    key: _HashedText,
+    strategy: ChunkingStrategy,
+    chunk_size: int,
+    overlap: int
+) -> Tuple[Chunk, ...]:
+    """Chunk key.text; cached per (text, strategy, chunk_size, overlap)."""
+    text = key.text
     if strategy == "fixed_chars":
-        return _chunk_by_fixed_chars(text, chunk_size, overlap)
+        return tuple(_chunk_by_fixed_chars(text, chunk_size, overlap))
     elif strategy == "paragraphs":
-        return _chunk_by_paragraphs(text, max_chars=chunk_size)
+        return tuple(_chunk_by_paragraphs(text, max_chars=chunk_size))
     elif strategy == "sentences":
-        return _chunk_by_sentences(text, sentences_per_chunk=chunk_size)
+        return tuple(_chunk_by_sentences(text, sentences_per_chunk=chunk_size))
     else:
         raise ValueError(f"Unknown chunking strategy: {strategy}")
 
 
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Handles periods, question marks, and exclamation points
+_SENTENCE_ENDING = re.compile(r'([.!?]+[\s\n]+)')
+
+
+@lru_cache(maxsize=16)
+def _split_paragraphs(text: str) -> Tuple[str, ...]:
+    """Stripped, non-empty paragraphs of text (cached per text)."""
+    return tuple(p for p in (para.strip() for para in _PARAGRAPH_BREAK.split(text)) if p)
+
+
+@lru_cache(maxsize=16)
+def _split_sentences(text: str) -> Tuple[str, ...]:
+    """Stripped, non-empty sentences of text, punctuation kept (cached per text)."""
+    parts = _SENTENCE_ENDING.split(text)
+    
+    # Reconstruct sentences by combining text and punctuation
+    sentences = []
+    for i in range(0, len(parts) - 1, 2):
+        sentence = (parts[i] + parts[i + 1]).strip()
+        if sentence:
+            sentences.append(sentence)
+    
+    # Handle last part if no ending punctuation
+    if len(parts) % 2 == 1 and parts[-1].strip():
+        sentences.append(parts[-1].strip())
+    
+    return tuple(sentences)
+
+
+def _split(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Return (paragraphs, sentences) for text.
+    
+    The splits are the linear scans behind every strategy; they're cached,
+    so chunking the same text again with another strategy or size reuses them.
+    """
+    return _split_paragraphs(text), _split_sentences(text)
+
+
 def _chunk_by_fixed_chars(text: str, chunk_size: int, overlap: int) -> List[Chunk]:
     """
     Chunk text into fixed-size character chunks with overlap.
@@ -126,7 +200,7 @@ def _chunk_by_paragraphs(text: str, max_chars: int = 1000) -> List[Chunk]:
         List of Chunk objects
     """
     # Split by double newlines (paragraph boundaries)
-    paragraphs = re.split(r'\n\s*\n', text)
+    paragraphs = _split_paragraphs(text)
     
     chunks = []
     current_chunk = []
@@ -135,10 +209,6 @@ def _chunk_by_paragraphs(text: str, max_chars: int = 1000) -> List[Chunk]:
     chunk_number = 0
     
     for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-        
         para_length = len(para)
         
         # If adding this paragraph would exceed max_chars, save current chunk
@@ -186,25 +256,7 @@ def _chunk_by_sentences(text: str, sentences_per_chunk: int = 5) -> List[Chunk]:
     Returns:
         List of Chunk objects
     """
-    # Split into sentences using regex
-    # This handles periods, question marks, and exclamation points
-    sentence_endings = re.compile(r'([.!?]+[\s\n]+)')
-    
-    parts = sentence_endings.split(text)
-    
-    # Reconstruct sentences by combining text and punctuation
-    sentences = []
-    for i in range(0, len(parts) - 1, 2):
-        sentence = parts[i]
-        if i + 1 < len(parts):
-            sentence += parts[i + 1]
-        sentence = sentence.strip()
-        if sentence:
-            sentences.append(sentence)
-    
-    # Handle last part if no ending punctuation
-    if len(parts) % 2 == 1 and parts[-1].strip():
-        sentences.append(parts[-1].strip())
+    sentences = _split_sentences(text)
     
     chunks = []
     chunk_number = 0
@@ -6,7 +6,7 @@ Tracks articles, generated posts, comments, and posting history.
 import sqlite3
 import os
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from contextlib import contextmanager
 from dataclasses import dataclass
 
@@ -127,6 +127,7 @@ CREATE INDEX IF NOT EXISTS idx_articles_last_seen ON articles(last_seen_at DESC)
 CREATE INDEX IF NOT EXISTS idx_posts_status ON posts(status);
 CREATE INDEX IF NOT EXISTS idx_posts_created_at ON posts(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_posts_posted_at ON posts(posted_at DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_mastodon_id ON posts(mastodon_id);
 
 CREATE INDEX IF NOT EXISTS idx_comments_article_id ON comments(article_id);
 CREATE INDEX IF NOT EXISTS idx_comments_status ON comments(status);
@@ -146,7 +147,7 @@ CREATE TABLE IF NOT EXISTS document_chunks (
     chunk_text TEXT NOT NULL,
     chunk_number INTEGER NOT NULL,
     chunk_strategy TEXT,  -- 'fixed_chars', 'paragraphs', 'sentences', 'hybrid'
-    embedding BLOB,  -- Stored as binary blob (pickled numpy array)
+    embedding BLOB,  -- float32 scale + int8 vector (see rag.encode_embedding)
     metadata TEXT,  -- JSON string for additional metadata
     created_at TEXT NOT NULL DEFAULT (datetime('now')),
     updated_at TEXT NOT NULL DEFAULT (datetime('now'))
@@ -181,6 +182,13 @@ CREATE TABLE IF NOT EXISTS mastodon_interactions (
     FOREIGN KEY (response_post_id) REFERENCES posts(id) ON DELETE SET NULL
 );
 
+-- Small key/value store for listener cursors (e.g. last seen notification id)
+CREATE TABLE IF NOT EXISTS listener_state (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
 -- Indices for new tables
 CREATE INDEX IF NOT EXISTS idx_chunks_source ON document_chunks(source_id, source_type);
 CREATE INDEX IF NOT EXISTS idx_chunks_created_at ON document_chunks(created_at DESC);
@@ -189,8 +197,11 @@ CREATE INDEX IF NOT EXISTS idx_notion_page_id ON notion_documents(notion_page_id
 CREATE INDEX IF NOT EXISTS idx_notion_synced ON notion_documents(last_synced_at DESC);
 
 CREATE INDEX IF NOT EXISTS idx_mastodon_interactions_type ON mastodon_interactions(interaction_type);
-CREATE INDEX IF NOT EXISTS idx_mastodon_interactions_responded ON mastodon_interactions(responded);
 CREATE INDEX IF NOT EXISTS idx_mastodon_interactions_created ON mastodon_interactions(created_at DESC);
+-- Partial index: only pending rows, so finding work doesn't scan the whole history.
+-- Supersedes the full index on the responded flag.
+DROP INDEX IF EXISTS idx_mastodon_interactions_responded;
+CREATE INDEX IF NOT EXISTS idx_mastodon_interactions_unresponded ON mastodon_interactions(id) WHERE responded = 0;
 
 -- Views for common queries
 CREATE VIEW IF NOT EXISTS v_recent_posts AS
@@ -234,6 +245,26 @@ ORDER BY q.scheduled_for ASC, q.priority DESC;
 """
 
 
+def connect(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """
+    Open a connection configured like get_db()'s, for callers that keep it
+    open across several operations (pass it on via the conn= arguments).
+    The caller commits and closes it.
+
+    db_path may also be an SQLite URI ("file:..."), e.g. a shared-cache
+    in-memory database: "file:name?mode=memory&cache=shared".
+    """
+    conn = sqlite3.connect(db_path, uri=db_path.startswith("file:"))
+    conn.row_factory = sqlite3.Row  # Enable column access by name
+    # Per-connection tuning. synchronous=NORMAL is only durable with WAL
+    # (set up by init_db()/migrate_db()); a rollback journal keeps FULL.
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
 @contextmanager
 def get_db(db_path: str = DEFAULT_DB_PATH):
     """
@@ -243,8 +274,7 @@ def get_db(db_path: str = DEFAULT_DB_PATH):
         with get_db() as conn:
             conn.execute("SELECT * FROM articles")
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
+    conn = connect(db_path)
     try:
         yield conn
         conn.commit()
@@ -255,16 +285,47 @@ def get_db(db_path: str = DEFAULT_DB_PATH):
         conn.close()
 
 
+@contextmanager
+def use_db(conn: Optional[sqlite3.Connection] = None, db_path: str = DEFAULT_DB_PATH):
+    """
+    Yield conn if the caller already has one open, otherwise a new get_db().
+
+    Lets helpers join the caller's transaction instead of committing on
+    their own: only the outermost get_db() commits.
+    """
+    if conn is not None:
+        yield conn
+    else:
+        with get_db(db_path) as new_conn:
+            yield new_conn
+
+
 def init_db(db_path: str = DEFAULT_DB_PATH) -> None:
     """Initialize the database with schema."""
     print(f"[*] Initializing database at {db_path}...")
 
     with get_db(db_path) as conn:
+        # WAL is persistent in the database file: readers no longer block
+        # writers, and commits don't need a full fsync of a rollback journal.
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.executescript(SCHEMA_SQL)
 
     print("[+] Database initialized successfully!")
 
 
+def migrate_db(db_path: str = DEFAULT_DB_PATH) -> None:
+    """
+    Bring an existing database up to the current schema.
+
+    Every statement in SCHEMA_SQL is IF NOT EXISTS, so this only adds
+    tables and indices introduced since the database was created. Also
+    switches databases created before WAL was enabled over to it.
+    """
+    with get_db(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA_SQL)
+
+
 def get_schema_info(db_path: str = DEFAULT_DB_PATH) -> Dict[str, Any]:
     """Get information about the database schema."""
     with get_db(db_path) as conn:
@@ -337,9 +398,10 @@ def save_article(url: str, title: str, source: str,
 
 def save_post(content: str, status: str = "draft",
               image_path: Optional[str] = None,
-              db_path: str = DEFAULT_DB_PATH) -> int:
+              db_path: str = DEFAULT_DB_PATH,
+              conn: Optional[sqlite3.Connection] = None) -> int:
     """Save a generated post. Returns post ID."""
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO posts (content, status, image_path)
@@ -361,10 +423,28 @@ def save_comment(article_id: int, content: str,
         return cursor.lastrowid
 
 
+def save_comments_bulk(rows: List[Tuple[int, str, str]],
+                       db_path: str = DEFAULT_DB_PATH) -> None:
+    """
+    Save many generated comments in one transaction.
+
+    Args:
+        rows: (article_id, content, status) tuples
+    """
+    if not rows:
+        return
+    with get_db(db_path) as conn:
+        conn.executemany("""
+            INSERT INTO comments (article_id, content, status)
+            VALUES (?, ?, ?)
+        """, rows)
+
+
 def mark_post_posted(post_id: int, mastodon_id: Optional[str] = None,
-                    db_path: str = DEFAULT_DB_PATH) -> None:
+                    db_path: str = DEFAULT_DB_PATH,
+                    conn: Optional[sqlite3.Connection] = None) -> None:
     """Mark a post as successfully posted."""
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         conn.execute("""
             UPDATE posts
             SET status = 'posted',
@@ -410,9 +490,10 @@ def get_article_by_url(url: str, db_path: str = DEFAULT_DB_PATH) -> Optional[Art
 
 def log_metric(metric_type: str, metric_value: Optional[float] = None,
               metadata: Optional[str] = None,
-              db_path: str = DEFAULT_DB_PATH) -> None:
+              db_path: str = DEFAULT_DB_PATH,
+              conn: Optional[sqlite3.Connection] = None) -> None:
     """Log a metric for analytics."""
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         conn.execute("""
             INSERT INTO metrics (metric_type, metric_value, metadata)
             VALUES (?, ?, ?)
@@ -452,11 +533,12 @@ def save_document_chunk(source_id: str, source_type: str, chunk_text: str,
                        chunk_number: int, chunk_strategy: str,
                        embedding: Optional[bytes] = None,
                        metadata: Optional[str] = None,
-                       db_path: str = DEFAULT_DB_PATH) -> int:
+                       db_path: str = DEFAULT_DB_PATH,
+                       conn: Optional[sqlite3.Connection] = None) -> int:
     """
     Save a document chunk with optional embedding. Returns chunk ID.
     """
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO document_chunks
@@ -466,12 +548,31 @@ def save_document_chunk(source_id: str, source_type: str, chunk_text: str,
         return cursor.lastrowid
 
 
+def save_document_chunks_bulk(rows: List[tuple],
+                              db_path: str = DEFAULT_DB_PATH,
+                              conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Insert many document chunks with one executemany in a single transaction.
+
+    rows are (source_id, source_type, chunk_text, chunk_number, chunk_strategy,
+    embedding, metadata) tuples. Returns the number of rows inserted.
+    """
+    with use_db(conn, db_path) as conn:
+        cursor = conn.executemany("""
+            INSERT INTO document_chunks
+            (source_id, source_type, chunk_text, chunk_number, chunk_strategy, embedding, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        return cursor.rowcount
+
+
 def get_document_chunks(source_id: str, source_type: str,
-                       db_path: str = DEFAULT_DB_PATH) -> List[Dict[str, Any]]:
+                       db_path: str = DEFAULT_DB_PATH,
+                       conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
     """
     Get all chunks for a specific document.
     """
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         rows = conn.execute("""
             SELECT id, chunk_text, chunk_number, chunk_strategy, metadata
             FROM document_chunks
@@ -485,11 +586,12 @@ def save_mastodon_interaction(mastodon_id: str, interaction_type: str,
                               author_account: str, content: str,
                               in_reply_to_id: Optional[str] = None,
                               our_post_id: Optional[int] = None,
-                              db_path: str = DEFAULT_DB_PATH) -> int:
+                              db_path: str = DEFAULT_DB_PATH,
+                              conn: Optional[sqlite3.Connection] = None) -> int:
     """
     Save a Mastodon interaction (mention, reply, comment). Returns interaction ID.
     """
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         cursor = conn.cursor()
         
         # Check if interaction already exists
@@ -518,18 +620,46 @@ def get_unresponded_interactions(limit: int = 10,
                    in_reply_to_id, our_post_id, created_at
             FROM mastodon_interactions
             WHERE responded = 0
-            ORDER BY created_at ASC
+            ORDER BY id ASC
             LIMIT ?
         """, (limit,)).fetchall()
         return [dict(row) for row in rows]
 
 
+def claim_unresponded_interactions(limit: int = 10, lease_seconds: int = 600,
+                                   db_path: str = DEFAULT_DB_PATH) -> List[Dict[str, Any]]:
+    """
+    Atomically claim unresponded interactions for processing.
+
+    Claimed rows get processed_at stamped, so a concurrent responder won't
+    pick them up again. A claim that is never marked responded (crash,
+    failed reply) lapses after lease_seconds and the row is retried.
+    """
+    with get_db(db_path) as conn:
+        rows = conn.execute("""
+            UPDATE mastodon_interactions
+            SET processed_at = datetime('now')
+            WHERE id IN (
+                SELECT id FROM mastodon_interactions
+                WHERE responded = 0
+                  AND (processed_at IS NULL OR processed_at < datetime('now', ?))
+                ORDER BY id ASC
+                LIMIT ?
+            )
+            RETURNING id, mastodon_id, interaction_type, author_account, content,
+                      in_reply_to_id, our_post_id, created_at
+        """, (f"-{int(lease_seconds)} seconds", limit)).fetchall()
+        # RETURNING order is unspecified; hand them out oldest first
+        return sorted((dict(row) for row in rows), key=lambda r: r["id"])
+
+
 def mark_interaction_responded(interaction_id: int, response_post_id: Optional[int] = None,
-                               db_path: str = DEFAULT_DB_PATH) -> None:
+                               db_path: str = DEFAULT_DB_PATH,
+                               conn: Optional[sqlite3.Connection] = None) -> None:
     """
     Mark a Mastodon interaction as responded.
     """
-    with get_db(db_path) as conn:
+    with use_db(conn, db_path) as conn:
         conn.execute("""
             UPDATE mastodon_interactions
             SET responded = 1,
@@ -539,6 +669,27 @@ def mark_interaction_responded(interaction_id: int, response_post_id: Optional[i
         """, (response_post_id, interaction_id))
 
 
+def get_listener_state(key: str, db_path: str = DEFAULT_DB_PATH) -> Optional[str]:
+    """
+    Get a persisted listener value, or None if it was never set.
+    """
+    with get_db(db_path) as conn:
+        row = conn.execute("SELECT value FROM listener_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+
+def set_listener_state(key: str, value: Optional[str],
+                       db_path: str = DEFAULT_DB_PATH) -> None:
+    """
+    Persist a listener value so it survives restarts.
+    """
+    with get_db(db_path) as conn:
+        conn.execute("""
+            INSERT INTO listener_state (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = datetime('now')
+        """, (key, value))
+
+
 def get_stats(db_path: str = DEFAULT_DB_PATH) -> Dict[str, Any]:
     """Get overall statistics about the database."""
     with get_db(db_path) as conn:
@@ -1,10 +1,11 @@
 import os
 import json
-from typing import List, Optional
+from typing import List, Optional, Union
 from openai import OpenAI
 from pydantic import BaseModel, ValidationError
 
-from articles import Article
+from articles import Article, dedupe_articles
+from notion import BrandDocs, BRAND_DOCS_SHORT_CHARS
 
 
 def _get_client() -> OpenAI:
@@ -16,15 +17,46 @@ def _get_client() -> OpenAI:
 
 def _extract_json_object(text: str) -> Optional[str]:
     """
-    Best-effort extraction of a JSON object from model output.
+    Best-effort extraction of the first complete JSON object from model output.
+
+    Single pass from the first "{", tracking brace depth and skipping braces
+    inside string literals, so trailing prose or a second object doesn't
+    widen the match.
     """
     if not text:
         return None
     start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
+    if start == -1:
         return None
-    return text[start : end + 1]
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def _brand_docs_excerpt(brand_docs: Union[BrandDocs, str]) -> str:
+    """Short view of the brand docs; precomputed when given a BrandDocs."""
+    if isinstance(brand_docs, BrandDocs):
+        return brand_docs.short
+    return (brand_docs or "")[:BRAND_DOCS_SHORT_CHARS]
 
 
 class ArticleComments(BaseModel):
@@ -37,12 +69,12 @@ class ArticleComments(BaseModel):
 class ArticleCommentsResult(BaseModel):
     items: List[ArticleComments]
 
-def generate_social_post(brand_docs, use_rag: bool = False, rag_query: Optional[str] = None):
+def generate_social_post(brand_docs: Union[BrandDocs, str], use_rag: bool = False, rag_query: Optional[str] = None):
     """
     Uses brand docs to generate a single social media post.
     
     Args:
-        brand_docs: Brand documentation text
+        brand_docs: Brand documentation (BrandDocs or plain text)
         use_rag: Whether to use RAG retrieval for context
         rag_query: Query for RAG retrieval (if None, uses a default)
     
@@ -89,7 +121,7 @@ def generate_social_post(brand_docs, use_rag: bool = False, rag_query: Optional[
 
 def generate_comment_reply(
     original_comment: str,
-    brand_docs: str,
+    brand_docs: Union[BrandDocs, str],
     use_rag: bool = True
 ) -> str:
     """
@@ -97,7 +129,7 @@ def generate_comment_reply(
     
     Args:
         original_comment: The comment we're replying to
-        brand_docs: Brand documentation
+        brand_docs: Brand documentation (BrandDocs or plain text)
         use_rag: Whether to use RAG for context
         
     Returns:
@@ -114,7 +146,7 @@ def generate_comment_reply(
             # Use the comment itself as the query to find relevant context
             rag_context = build_rag_context(original_comment, top_k=2)
             if rag_context:
-                context = f"{rag_context}\n\n--- Additional Context ---\n{brand_docs[:500]}"
+                context = f"{rag_context}\n\n--- Additional Context ---\n{_brand_docs_excerpt(brand_docs)}"
         except Exception as e:
             print(f"Warning: RAG retrieval failed: {e}")
     
@@ -147,7 +179,7 @@ Reply:
 
 
 def generate_article_comments(
-    brand_docs: str,
+    brand_docs: Union[BrandDocs, str],
     articles: List[Article],
     *,
     comments_per_article: int = 2,
@@ -158,6 +190,9 @@ def generate_article_comments(
     """
     client = _get_client()
 
+    # Feeds often carry the same story; don't spend tokens on it twice
+    articles = dedupe_articles(articles)
+
     article_lines = []
     for idx, a in enumerate(articles, start=1):
         summary = (a.summary or "").strip()
@@ -15,9 +15,9 @@ from notion import get_brand_docs
 from llm import generate_social_post, generate_article_comments
 from mastodon_client import get_mastodon_client, post_to_mastodon
 from articles import get_top_baking_articles
-from replicate_client import generate_image
+from replicate_client import generate_image, MIN_PROMPT_LENGTH
 from database import (
-    init_db, save_article, save_post, save_comment,
+    init_db, migrate_db, save_article, save_post, save_comments_bulk,
     mark_post_posted, mark_comment_posted, log_metric, get_stats
 )
 
@@ -46,11 +46,14 @@ def run_post_flow(use_rag=False):
             prompt = input("Image prompt (press Enter to use the post text): ").strip()
             if not prompt:
                 prompt = post
-            print("🎨 Generating image...")
-            img = generate_image(prompt=prompt, output_format="png")
-            media_path = img.path
-            print(f"🖼️ Image saved: {media_path}")
-            log_metric("image_generated", 1.0)
+            if len(prompt) < MIN_PROMPT_LENGTH:
+                print(f"⚠️ Image prompt too short (min {MIN_PROMPT_LENGTH} characters); continuing without image.")
+            else:
+                print("🎨 Generating image...")
+                img = generate_image(prompt=prompt, output_format="png")
+                media_path = img.path
+                print(f"🖼️ Image saved: {media_path}")
+                log_metric("image_generated", 1.0)
     except Exception as e:
         print(f"⚠️ Image generation failed (will continue without image): {e}")
         media_path = None
@@ -117,11 +120,13 @@ def run_baking_flow(args: argparse.Namespace) -> None:
     )
 
     # Save comments to database
-    for item in items:
-        article_id = article_ids.get(item.url)
-        if article_id:
-            for comment_text in item.comments:
-                save_comment(article_id, comment_text, status="draft")
+    comment_rows = [
+        (article_ids[item.url], comment_text, "draft")
+        for item in items
+        if item.url in article_ids
+        for comment_text in item.comments
+    ]
+    save_comments_bulk(comment_rows)
 
     log_metric("comments_generated", sum(len(item.comments) for item in items))
 
@@ -186,12 +191,20 @@ def run_notion_listener_flow(interval=300):
     run_notion_listener(poll_interval=interval, auto_generate=True)
 
 
-def run_mastodon_listener_flow(interval=180, auto_reply=False):
+def run_mastodon_listener_flow(interval=180, auto_reply=False, stream=False):
     """Run Mastodon listener to handle comments."""
+    import logging
     from mastodon_listener import run_mastodon_listener
     
+    # The listener reports through logging; show its INFO lines like prints
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("mastodon_listener").setLevel(logging.INFO)
+    
     print("🔔 Starting Mastodon listener...")
-    print(f"   Checking for mentions every {interval} seconds")
+    if stream:
+        print("   Streaming mentions as they arrive")
+    else:
+        print(f"   Checking for mentions every {interval} seconds")
     print(f"   Auto-reply: {'✅ ENABLED' if auto_reply else '❌ Disabled (draft mode)'}")
     print("   Press Ctrl+C to stop\n")
     
@@ -201,7 +214,7 @@ def run_mastodon_listener_flow(interval=180, auto_reply=False):
             print("Cancelled")
             return
     
-    run_mastodon_listener(auto_reply=auto_reply, poll_interval=interval)
+    run_mastodon_listener(auto_reply=auto_reply, poll_interval=interval, stream=stream)
 
 
 def main():
@@ -212,6 +225,8 @@ def main():
         print("🔧 First run detected. Initializing database...")
         init_db()
         print()
+    else:
+        migrate_db()
 
     parser = argparse.ArgumentParser(prog="soft_batch")
     subparsers = parser.add_subparsers(dest="command")
@@ -233,6 +248,7 @@ def main():
     mastodon_listen = subparsers.add_parser("mastodon-listen", help="Start Mastodon listener for auto-replies")
     mastodon_listen.add_argument("--interval", type=int, default=180, help="Poll interval in seconds")
     mastodon_listen.add_argument("--auto-reply", action="store_true", help="Auto-post replies (vs draft)")
+    mastodon_listen.add_argument("--stream", action="store_true", help="Use the streaming API instead of polling")
 
     args = parser.parse_args()
 
@@ -265,7 +281,7 @@ def main():
         return
     
     if args.command == "mastodon-listen":
-        run_mastodon_listener_flow(interval=args.interval, auto_reply=args.auto_reply)
+        run_mastodon_listener_flow(interval=args.interval, auto_reply=args.auto_reply, stream=args.stream)
         return
 
     # Default behavior (no subcommand): generate a single post from Notion brand docs.
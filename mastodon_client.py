@@ -1,8 +1,144 @@
 from mastodon import Mastodon, MastodonError
+import atexit
+import functools
+import hashlib
+import json
 import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Disclosure appended to every post we publish
+_AI_SUFFIX = "\n\n🤖 AI-generated content"
+
+# The bot's own account (id, acct) doesn't change; cache it for a day on disk
+ACCOUNT_CACHE_TTL = 24 * 3600
+_account_cache: dict = {}
+
+
+class MastodonRateLimiter:
+    """
+    Shared gate in front of Mastodon API calls.
+
+    Caps the number of requests in flight and tracks the server's
+    X-RateLimit-Remaining / X-RateLimit-Reset budget. Once the budget is
+    nearly spent, callers queue behind a single wait for the reset instead
+    of each running into a 429 and sleeping on its own.
+    """
+
+    def __init__(self, max_in_flight: int = 4, reserve: int = 5):
+        self.reserve = reserve
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._remaining: Optional[int] = None
+        self._reset_at = 0.0
+        # Everyone waits until this time once the budget has run out
+        self._blocked_until = 0.0
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Record the budget from a raw Mastodon HTTP response's headers.
+
+        Headers that are missing or can't be parsed are ignored.
+        """
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+        except (KeyError, TypeError, ValueError):
+            remaining = None
+        reset_at = _parse_ratelimit_reset(headers.get("X-RateLimit-Reset"))
+        with self._lock:
+            if remaining is not None:
+                self._remaining = remaining
+            if reset_at is not None:
+                self._reset_at = reset_at
+
+    def _update_from_client(self, client) -> None:
+        # Mastodon.py parses the same headers onto the client after each call
+        remaining = getattr(client, "ratelimit_remaining", None)
+        with self._lock:
+            if remaining is not None:
+                self._remaining = int(remaining)
+                self._reset_at = float(getattr(client, "ratelimit_reset", 0.0))
+
+    def _wait_for_budget(self) -> None:
+        # Once the budget is nearly spent, every caller waits for the same
+        # reset time and they resume together. The sleep happens outside
+        # the lock, so update() and other callers aren't blocked meanwhile.
+        with self._lock:
+            if self._remaining is not None and self._remaining <= self.reserve:
+                self._blocked_until = max(self._blocked_until, self._reset_at)
+                self._remaining = None
+            elif self._remaining is not None:
+                self._remaining -= 1
+            delay = self._blocked_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self, client=None):
+        """
+        Context manager around one API call.
+
+        Usage:
+            with rate_limiter.slot(client):
+                client.status_post(...)
+        """
+        with self._slots:
+            self._wait_for_budget()
+            try:
+                yield
+            finally:
+                if client is not None:
+                    self._update_from_client(client)
+
+
+def _parse_ratelimit_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Epoch seconds from an X-RateLimit-Reset header, or None if unparseable.
+
+    Like Mastodon.py, accepts an integer epoch ("1714564800") as well as
+    an ISO 8601 timestamp; a timestamp without a zone is taken as UTC.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset.tzinfo is None:
+        reset = reset.replace(tzinfo=timezone.utc)
+    return reset.timestamp()
+
+
+# One limiter per process: the budget is per account, not per caller
+rate_limiter = MastodonRateLimiter()
+
+# Called with the new status after post_to_mastodon succeeds (e.g. to wake a listener)
+_post_callbacks: List[Callable[[Any], None]] = []
+
+
+def add_post_callback(callback: Callable[[Any], None]) -> None:
+    """Run callback(status) after every successful post_to_mastodon."""
+    _post_callbacks.append(callback)
+
+
+def remove_post_callback(callback: Callable[[Any], None]) -> None:
+    if callback in _post_callbacks:
+        _post_callbacks.remove(callback)
+
 
 def get_mastodon_client():
-    """Creates and returns a Mastodon client instance."""
+    """Returns the shared Mastodon client for the configured account."""
     access_token = os.getenv("MASTODON_ACCESS_TOKEN")
     api_base_url = os.getenv("MASTODON_BASE_URL")
 
@@ -11,36 +147,130 @@ def get_mastodon_client():
     if not api_base_url:
         raise ValueError("MASTODON_BASE_URL environment variable is not set")
 
+    return _build_client(access_token, api_base_url)
+
+
+@functools.lru_cache(maxsize=1)
+def _build_client(access_token: str, api_base_url: str) -> Mastodon:
+    """
+    One shared client per (token, instance), so every caller reuses the
+    same pooled keep-alive connections instead of opening its own.
+
+    GETs are retried with backoff on 429/5xx; POSTs are not (urllib3's
+    default allowed_methods), so a status is never posted twice.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,  # hand the last response to Mastodon.py's own error handling
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    atexit.register(session.close)
+
     try:
         return Mastodon(
             access_token=access_token,
             api_base_url=api_base_url,
+            session=session,
         )
     except Exception as e:
+        session.close()
         raise RuntimeError(f"Failed to create Mastodon client: {str(e)}") from e
 
-def post_to_mastodon(client, text, *, media_path: str | None = None, alt_text: str | None = None):
-    """Posts text to Mastodon (optionally with an attached image). Raises exception on failure."""
+def _account_cache_path(key: str) -> str:
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "soft_batch", f"me_{key}.json")
+
+
+def get_account(client) -> dict:
+    """
+    Returns {"id", "acct"} for the client's own account.
+
+    Cached per (instance, token) in-process and on disk for
+    ACCOUNT_CACHE_TTL, so short CLI runs skip the verify_credentials
+    round trip. Only the id and handle are stored, keyed by a hash of the
+    token rather than the token itself.
+    """
+    token = getattr(client, "access_token", None) or ""
+    base_url = getattr(client, "api_base_url", None) or ""
+    key = hashlib.sha256(f"{base_url}\0{token}".encode()).hexdigest()[:16]
+
+    account = _account_cache.get(key)
+    if account:
+        return account
+
+    path = _account_cache_path(key)
+    if token:
+        try:
+            if time.time() - os.path.getmtime(path) < ACCOUNT_CACHE_TTL:
+                with open(path, encoding="utf-8") as f:
+                    account = json.load(f)
+        except (OSError, ValueError):
+            account = None
+
+    if not account or "id" not in account or "acct" not in account:
+        me = client.me()
+        account = {"id": str(me["id"]), "acct": me["acct"]}
+        if token:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(account, f)
+            except OSError:
+                pass
+
+    _account_cache[key] = account
+    return account
+
+def upload_media(client, media_path: str, alt_text: str | None = None) -> str:
+    """
+    Uploads an image and returns its media id.
+
+    Uses synchronous=False so the call returns as soon as the bytes are
+    in, without polling until server-side processing finishes. Callers
+    posting several images can run uploads in a thread pool and pass the
+    ids to post_to_mastodon(media_id=...).
+    """
+    with rate_limiter.slot(client):
+        media = client.media_post(media_path, description=alt_text, synchronous=False)
+    media_id = media.get("id") if isinstance(media, dict) else getattr(media, "id", None)
+    if not media_id:
+        raise RuntimeError("Failed to upload media (no media id returned)")
+    return media_id
+
+def post_to_mastodon(client, text, *, media_path: str | None = None, alt_text: str | None = None,
+                     media_id: str | None = None):
+    """
+    Posts text to Mastodon (optionally with an attached image). Raises exception on failure.
+
+    Pass media_id for an image already uploaded with upload_media, or
+    media_path to upload it here.
+    """
     if not client:
         raise ValueError("Mastodon client is required")
     if not text or not text.strip():
         raise ValueError("Post text cannot be empty")
 
     try:
-        post_text = text + "\n\n🤖 AI-generated content"
+        post_text = text + _AI_SUFFIX
 
-        media_ids = None
-        if media_path:
+        if media_path and not media_id:
             # Upload media first, then attach it to the status.
-            media = client.media_post(media_path, description=alt_text)
-            media_id = media.get("id") if isinstance(media, dict) else getattr(media, "id", None)
-            if not media_id:
-                raise RuntimeError("Failed to upload media (no media id returned)")
-            media_ids = [media_id]
-
-        result = client.status_post(post_text, media_ids=media_ids)
-        return result
+            media_id = upload_media(client, media_path, alt_text)
+        media_ids = [media_id] if media_id else None
+
+        with rate_limiter.slot(client):
+            result = client.status_post(post_text, media_ids=media_ids)
     except MastodonError as e:
         raise RuntimeError(f"Mastodon API error: {str(e)}") from e
     except Exception as e:
         raise RuntimeError(f"Failed to post to Mastodon: {str(e)}") from e
+
+    for callback in list(_post_callbacks):
+        try:
+            callback(result)
+        except Exception:
+            pass
+    return result
@@ -7,67 +7,137 @@ This module provides functionality to:
 3. Post replies automatically or save as drafts
 """
 import os
-import time
+import re
+import logging
+import queue
+import asyncio
+import threading
+import sqlite3
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
 
-from mastodon import Mastodon
-from mastodon_client import get_mastodon_client, post_to_mastodon
+from mastodon import Mastodon, StreamListener
+
+try:
+    from selectolax.parser import HTMLParser  # type: ignore
+except ImportError:
+    HTMLParser = None  # type: ignore
+
+from mastodon_client import (
+    get_mastodon_client,
+    rate_limiter,
+    add_post_callback,
+    remove_post_callback,
+    get_account
+)
 from llm import generate_comment_reply
 from notion import get_brand_docs
 from database import (
     save_mastodon_interaction,
-    get_unresponded_interactions,
+    claim_unresponded_interactions,
     mark_interaction_responded,
     save_post,
     mark_post_posted,
     log_metric,
     get_db,
+    use_db,
+    migrate_db,
+    get_listener_state,
+    set_listener_state,
     DEFAULT_DB_PATH
 )
 
+logger = logging.getLogger(__name__)
 
-class MastodonListener:
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Max interactions processed at once (LLM call + status post each)
+DEFAULT_MAX_CONCURRENCY = 8
+
+# How often the streaming loop checks that the stream is still connected
+STREAM_HEALTH_CHECK_SECONDS = 30
+
+# How often an idle responder checks the database for claimable work
+DEFAULT_RESPONDER_INTERVAL = 30
+
+# Idle polls back off exponentially up to this many seconds
+MAX_POLL_INTERVAL = 900
+
+# listener_state key for the newest notification id we've fetched
+LAST_NOTIFICATION_KEY = "mastodon_last_notification_id"
+
+# Stay well under SQLite's bound-parameter limit in IN (...) lookups
+SQL_IN_CHUNK_SIZE = 500
+
+
+def _strip_html(content: str) -> str:
+    """Plain text of a status body; uses selectolax when installed."""
+    if HTMLParser is not None:
+        return HTMLParser(content).text(separator=" ").strip()
+    return _HTML_TAG_RE.sub('', content)
+
+
+def _mention_statuses(notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The statuses of the mention notifications."""
+    return [
+        notif["status"] for notif in notifications
+        if notif.get("type") == "mention" and notif.get("status")
+    ]
+
+
+class _NotificationQueue(StreamListener):
+    """Stream listener that hands notifications to the listener's main loop."""
+    
+    def __init__(self, notifications: "queue.Queue[Any]"):
+        super().__init__()
+        self._notifications = notifications
+    
+    def on_notification(self, notification):
+        self._notifications.put(notification)
+
+
+class MastodonFetcher:
     """
-    Listener for Mastodon mentions and comments.
+    Pulls new mentions from Mastodon into the database.
     
-    Monitors timeline for interactions and can auto-reply.
+    Only fetches and stores; replying is MastodonResponder's job, so a
+    burst of mentions queues up in SQLite instead of being answered inline.
     """
     
     def __init__(
         self,
-        client: Optional[Mastodon] = None,
-        auto_reply: bool = False,
-        use_rag: bool = True,
-        poll_interval: int = 180,  # 3 minutes default
-        db_path: str = DEFAULT_DB_PATH
+        client: Mastodon,
+        db_path: str = DEFAULT_DB_PATH,
+        db_write_lock: Optional[threading.Lock] = None
     ):
         """
-        Initialize Mastodon listener.
+        Initialize the fetcher.
         
         Args:
-            client: Mastodon client (defaults to creating one from env)
-            auto_reply: Whether to automatically post replies (vs save as draft)
-            use_rag: Whether to use RAG for generating replies
-            poll_interval: How often to check for new interactions (seconds)
+            client: Mastodon client
             db_path: Database path
+            db_write_lock: Lock shared with the responder to serialize writes
         """
-        self.client = client or get_mastodon_client()
-        self.auto_reply = auto_reply
-        self.use_rag = use_rag
-        self.poll_interval = poll_interval
+        self.client = client
         self.db_path = db_path
+        self._db_write_lock = db_write_lock or threading.Lock()
         
-        # Get our account info
-        self.account = self.client.me()
-        self.account_id = self.account["id"]
+        # Track last seen notification ID; persisted so restarts only fetch new items
+        migrate_db(self.db_path)
+        self._last_notification_id: Optional[str] = get_listener_state(
+            LAST_NOTIFICATION_KEY, db_path=self.db_path
+        )
         
-        # Track last seen notification ID
-        self._last_notification_id: Optional[str] = None
+        # Validators from the last notifications response, for conditional GETs
+        self._notifications_etag: Optional[str] = None
+        self._notifications_last_modified: Optional[str] = None
     
     def fetch_notifications(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
-        Fetch recent notifications (mentions, replies, etc).
+        Fetch notifications (mentions, replies, etc) newer than the cursor.
+        
+        Doesn't move the cursor; store_notifications() does that once the
+        batch is committed, so a failed store is fetched again next time.
         
         Args:
             limit: Max number of notifications to fetch
@@ -75,15 +145,84 @@ class MastodonListener:
         Returns:
             List of notification dicts
         """
+        exclude_types = ["follow", "favourite", "reblog", "poll"]
         try:
-            notifications = self.client.notifications(
-                limit=limit,
-                exclude_types=["follow", "favourite", "reblog", "poll"]
-            )
-            return [dict(n) for n in notifications]
+            if getattr(self.client, "session", None) is None:
+                with rate_limiter.slot(self.client):
+                    notifications = list(self.client.notifications(
+                        limit=limit,
+                        min_id=self._last_notification_id,
+                        exclude_types=exclude_types
+                    ))
+            else:
+                # The raw request bypasses Mastodon.py, so the client's
+                # ratelimit_* attributes are stale; the conditional fetch
+                # records the response headers itself
+                with rate_limiter.slot():
+                    notifications = self._fetch_notifications_conditional(limit, exclude_types)
         except Exception as e:
-            print(f"[Mastodon] Error fetching notifications: {e}")
+            logger.error("[Mastodon] Error fetching notifications: %s", e)
+            return []
+        
+        return notifications
+    
+    def advance_cursor(self, notification_ids: List[Any]) -> None:
+        """
+        Move the notification cursor past notification_ids and persist it.
+        
+        Only pass ids that are fully handled (stored, or nothing to store):
+        the next fetch starts after the newest of them.
+        """
+        if not notification_ids:
+            return
+        newest = str(max(notification_ids, key=int))
+        if self._last_notification_id is not None and int(newest) <= int(self._last_notification_id):
+            return
+        # Persist first: if the write fails the cursor stays where it was
+        set_listener_state(LAST_NOTIFICATION_KEY, newest, db_path=self.db_path)
+        self._last_notification_id = newest
+    
+    def _forget_validators(self) -> None:
+        # A 304 would hide notifications we still have to store
+        self._notifications_etag = None
+        self._notifications_last_modified = None
+    
+    def _fetch_notifications_conditional(
+        self,
+        limit: int,
+        exclude_types: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        GET /api/v1/notifications with If-None-Match / If-Modified-Since.
+        
+        On 304 nothing is downloaded or parsed; since the cursor moves past
+        everything we've seen, an unchanged response means nothing new.
+        """
+        headers = {"Authorization": f"Bearer {self.client.access_token}"}
+        if self._notifications_etag:
+            headers["If-None-Match"] = self._notifications_etag
+        if self._notifications_last_modified:
+            headers["If-Modified-Since"] = self._notifications_last_modified
+        
+        response = self.client.session.get(
+            f"{self.client.api_base_url}/api/v1/notifications",
+            params={
+                "limit": limit,
+                "min_id": self._last_notification_id,
+                "exclude_types[]": exclude_types
+            },
+            headers=headers,
+            timeout=30
+        )
+        rate_limiter.update(response.headers)
+        
+        if response.status_code == 304:
             return []
+        response.raise_for_status()
+        
+        self._notifications_etag = response.headers.get("ETag")
+        self._notifications_last_modified = response.headers.get("Last-Modified")
+        return response.json()
     
     def fetch_mentions(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -95,23 +234,50 @@ class MastodonListener:
         Returns:
             List of mention status dicts
         """
-        notifications = self.fetch_notifications(limit=limit)
-        
-        mentions = []
-        for notif in notifications:
-            if notif.get("type") == "mention":
-                status = notif.get("status")
-                if status:
-                    mentions.append(dict(status))
+        return _mention_statuses(self.fetch_notifications(limit=limit))
+    
+    def _load_our_posts_map(
+        self,
+        conn: sqlite3.Connection,
+        ids: List[str]
+    ) -> Dict[str, int]:
+        """
+        Map Mastodon status ids to our post ids with one query per 500 ids.
         
-        return mentions
+        Args:
+            conn: Open database connection
+            ids: Mastodon status ids (e.g. the in_reply_to_id of each mention)
+            
+        Returns:
+            Dict of {mastodon_id: post id} for the ids that are our posts
+        """
+        unique_ids = list(dict.fromkeys(str(i) for i in ids))
+        our_posts: Dict[str, int] = {}
+        for start in range(0, len(unique_ids), SQL_IN_CHUNK_SIZE):
+            chunk = unique_ids[start:start + SQL_IN_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, mastodon_id FROM posts WHERE mastodon_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                our_posts[row["mastodon_id"]] = row["id"]
+        return our_posts
     
-    def store_interaction(self, status: Dict[str, Any]) -> Optional[int]:
+    def store_interaction(
+        self,
+        status: Dict[str, Any],
+        our_posts_map: Optional[Dict[str, int]] = None,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> Optional[int]:
         """
         Store a Mastodon interaction in the database.
         
         Args:
             status: Status dict from Mastodon API
+            our_posts_map: Prefetched {mastodon_id: post id} from
+                _load_our_posts_map; looked up per status when omitted
+            conn: Open connection to write through (joins the caller's transaction)
             
         Returns:
             Interaction ID or None if already exists
@@ -125,14 +291,12 @@ class MastodonListener:
             our_post_id = None
             if in_reply_to:
                 # Check if we have this post in our database
-                with get_db(self.db_path) as conn:
-                    row = conn.execute(
-                        "SELECT id FROM posts WHERE mastodon_id = ?",
-                        (in_reply_to,)
-                    ).fetchone()
-                    if row:
-                        our_post_id = row["id"]
-                        interaction_type = "comment"
+                if our_posts_map is None:
+                    with use_db(conn, self.db_path) as db:
+                        our_posts_map = self._load_our_posts_map(db, [in_reply_to])
+                our_post_id = our_posts_map.get(str(in_reply_to))
+                if our_post_id is not None:
+                    interaction_type = "comment"
             
             # Save to database
             interaction_id = save_mastodon_interaction(
@@ -142,15 +306,160 @@ class MastodonListener:
                 content=status["content"],
                 in_reply_to_id=in_reply_to,
                 our_post_id=our_post_id,
-                db_path=self.db_path
+                db_path=self.db_path,
+                conn=conn
             )
             
             return interaction_id
             
         except Exception as e:
-            print(f"[Mastodon] Error storing interaction: {e}")
+            logger.error("[Mastodon] Error storing interaction: %s", e)
             return None
     
+    def store_mentions(self, mentions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Store a batch of mentions in one transaction.
+        
+        Args:
+            mentions: Mention status dicts (from a poll or the stream)
+            
+        Returns:
+            Dict with new_interactions and errors
+        """
+        results = {
+            "new_interactions": [],
+            "errors": []
+        }
+        
+        # One connection and one commit for the whole batch
+        with self._db_write_lock, get_db(self.db_path) as conn:
+            reply_ids = [m["in_reply_to_id"] for m in mentions if m.get("in_reply_to_id")]
+            our_posts_map = self._load_our_posts_map(conn, reply_ids)
+            
+            for status in mentions:
+                try:
+                    # Store in database (will skip if already exists)
+                    interaction_id = self.store_interaction(
+                        status, our_posts_map=our_posts_map, conn=conn
+                    )
+                    
+                    if interaction_id:
+                        results["new_interactions"].append({
+                            "id": interaction_id,
+                            "author": status["account"]["acct"],
+                            "mastodon_id": status["id"]
+                        })
+                    else:
+                        # store_interaction logged why
+                        results["errors"].append({
+                            "status_id": status.get("id"),
+                            "error": "not stored"
+                        })
+                        
+                except Exception as e:
+                    results["errors"].append({
+                        "status_id": status.get("id"),
+                        "error": str(e)
+                    })
+        
+        return results
+    
+    def store_notifications(self, notifications: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Store the mentions among notifications, then advance the cursor.
+        
+        The cursor only moves once the batch is committed, and never past
+        a mention that failed to store, so those are fetched again. If the
+        store itself fails, the exception propagates and the cursor stays.
+        
+        Args:
+            notifications: Notification dicts (from a poll or the stream)
+            
+        Returns:
+            Dict with new_interactions and errors
+        """
+        mentions = _mention_statuses(notifications)
+        try:
+            if mentions:
+                results = self.store_mentions(mentions)
+            else:
+                results = {"new_interactions": [], "errors": []}
+        except Exception:
+            self._forget_validators()
+            raise
+        
+        failed = {str(error["status_id"]) for error in results["errors"]}
+        if failed:
+            self._forget_validators()
+        handled = []
+        for notif in sorted(notifications, key=lambda n: int(n["id"])):
+            status = notif.get("status")
+            if notif.get("type") == "mention" and status and str(status["id"]) in failed:
+                break
+            handled.append(notif["id"])
+        self.advance_cursor(handled)
+        
+        return results
+    
+    def fetch_once(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Fetch new mentions and store them.
+        
+        Returns:
+            Dict with new_interactions and errors
+        """
+        return self.store_notifications(self.fetch_notifications(limit=limit))
+
+
+class MastodonResponder:
+    """
+    Replies to stored interactions.
+    
+    Work is claimed from the database (see claim_unresponded_interactions),
+    at most max_concurrency at a time, so a burst of mentions is drained at
+    a steady rate and a row is never answered twice by concurrent workers.
+    """
+    
+    def __init__(
+        self,
+        client: Mastodon,
+        auto_reply: bool = False,
+        use_rag: bool = True,
+        db_path: str = DEFAULT_DB_PATH,
+        max_concurrency: Optional[int] = None,
+        db_write_lock: Optional[threading.Lock] = None
+    ):
+        """
+        Initialize the responder.
+        
+        Args:
+            client: Mastodon client
+            auto_reply: Whether to automatically post replies (vs save as draft)
+            use_rag: Whether to use RAG for generating replies
+            db_path: Database path
+            max_concurrency: Max interactions processed concurrently
+                (defaults to MASTODON_MAX_CONCURRENCY env var, then 8)
+            db_write_lock: Lock shared with the fetcher to serialize writes
+        """
+        self.client = client
+        self.auto_reply = auto_reply
+        self.use_rag = use_rag
+        self.db_path = db_path
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("MASTODON_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        )
+        
+        # Worker threads overlap their LLM/HTTP calls but take turns writing,
+        # so concurrent replies never contend for the SQLite write lock
+        self._db_write_lock = db_write_lock or threading.Lock()
+        
+        # Warm the brand docs cache so the first reply skips the Notion fetch
+        try:
+            get_brand_docs()
+        except Exception:
+            # Continue without brand docs if Notion isn't configured
+            pass
+    
     def generate_reply(self, content: str, author: str) -> str:
         """
         Generate a reply to a comment/mention.
@@ -172,8 +481,7 @@ class MastodonListener:
                 pass
             
             # Strip HTML tags from content
-            import re
-            clean_content = re.sub(r'<[^>]+>', '', content)
+            clean_content = _strip_html(content)
             
             # Generate reply
             reply = generate_comment_reply(
@@ -183,13 +491,14 @@ class MastodonListener:
             )
             
             # Add @ mention at the start
-            if not reply.startswith(f"@{author}"):
-                reply = f"@{author} {reply}"
+            mention = "@" + author
+            if not reply.startswith(mention):
+                reply = mention + " " + reply
             
             return reply
             
         except Exception as e:
-            print(f"[Mastodon] Error generating reply: {e}")
+            logger.error("[Mastodon] Error generating reply: %s", e)
             # Fallback reply
             return f"@{author} Thanks for reaching out! We'll get back to you soon."
     
@@ -213,64 +522,242 @@ class MastodonListener:
             Post ID if reply was created, None otherwise
         """
         try:
-            print(f"[Mastodon] Processing interaction from @{author}")
+            logger.info("[Mastodon] Processing interaction from @%s", author)
             
             # Generate reply
             reply_text = self.generate_reply(content, author)
             
-            print(f"[Mastodon] Generated reply: {reply_text[:100]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Mastodon] Generated reply: %s...", reply_text[:100])
             
             if self.auto_reply:
                 # Post reply directly
-                print(f"[Mastodon] Posting reply...")
-                result = self.client.status_post(
-                    status=reply_text,
-                    in_reply_to_id=mastodon_id
-                )
-                
-                # Save to posts table
-                post_id = save_post(
-                    content=reply_text,
-                    status="posted",
-                    db_path=self.db_path
-                )
-                
-                # Mark as posted
-                mastodon_reply_id = result["id"]
-                mark_post_posted(post_id, mastodon_id=mastodon_reply_id, db_path=self.db_path)
-                
-                # Mark interaction as responded
-                mark_interaction_responded(
-                    interaction_id,
-                    response_post_id=post_id,
-                    db_path=self.db_path
-                )
+                logger.info("[Mastodon] Posting reply...")
+                with rate_limiter.slot(self.client):
+                    result = self.client.status_post(
+                        status=reply_text,
+                        in_reply_to_id=mastodon_id
+                    )
                 
-                log_metric("auto_reply_posted", 1.0, db_path=self.db_path)
-                print(f"[Mastodon] ✓ Posted reply")
+                # Record the reply in one transaction
+                with self._db_write_lock, get_db(self.db_path) as conn:
+                    # Save to posts table
+                    post_id = save_post(
+                        content=reply_text,
+                        status="posted",
+                        conn=conn
+                    )
+                    
+                    # Mark as posted
+                    mastodon_reply_id = result["id"]
+                    mark_post_posted(post_id, mastodon_id=mastodon_reply_id, conn=conn)
+                    
+                    # Mark interaction as responded
+                    mark_interaction_responded(
+                        interaction_id,
+                        response_post_id=post_id,
+                        conn=conn
+                    )
+                    
+                    log_metric("auto_reply_posted", 1.0, conn=conn)
+                logger.info("[Mastodon] ✓ Posted reply")
                 
                 return post_id
             else:
                 # Save as draft
-                post_id = save_post(
-                    content=reply_text,
-                    status="draft",
-                    db_path=self.db_path
-                )
-                
-                log_metric("auto_reply_drafted", 1.0, db_path=self.db_path)
-                print(f"[Mastodon] ✓ Saved reply as draft (ID: {post_id})")
+                with self._db_write_lock, get_db(self.db_path) as conn:
+                    post_id = save_post(
+                        content=reply_text,
+                        status="draft",
+                        conn=conn
+                    )
+                    
+                    # The draft is our response; don't draft this one again
+                    mark_interaction_responded(
+                        interaction_id,
+                        response_post_id=post_id,
+                        conn=conn
+                    )
+                    
+                    log_metric("auto_reply_drafted", 1.0, conn=conn)
+                logger.info("[Mastodon] ✓ Saved reply as draft (ID: %s)", post_id)
                 
                 return post_id
                 
         except Exception as e:
-            print(f"[Mastodon] Error processing interaction: {e}")
+            logger.error("[Mastodon] Error processing interaction: %s", e)
             return None
     
-    def poll_once(self) -> Dict[str, Any]:
+    async def _process_one(
+        self,
+        interaction: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Optional[int]:
+        """Run process_interaction in a worker thread, bounded by the semaphore."""
+        async with semaphore:
+            return await asyncio.to_thread(
+                self.process_interaction,
+                interaction_id=interaction["id"],
+                mastodon_id=interaction["mastodon_id"],
+                content=interaction["content"],
+                author=interaction["author_account"]
+            )
+    
+    async def arespond_once(self, limit: Optional[int] = None) -> Dict[str, Any]:
         """
-        Poll for new interactions once.
+        Claim a batch of unresponded interactions and reply concurrently.
         
+        The Mastodon and LLM clients are blocking, so each interaction runs
+        in a worker thread; up to max_concurrency of them overlap their
+        network round trips.
+        
+        Args:
+            limit: Max interactions to claim (defaults to max_concurrency)
+            
+        Returns:
+            Dict with claimed, replies_generated and errors
+        """
+        results = {
+            "claimed": [],
+            "replies_generated": [],
+            "errors": []
+        }
+        
+        claimed = await asyncio.to_thread(
+            claim_unresponded_interactions,
+            limit=limit or self.max_concurrency,
+            db_path=self.db_path
+        )
+        results["claimed"] = [interaction["id"] for interaction in claimed]
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outcomes = await asyncio.gather(
+            *(self._process_one(interaction, semaphore) for interaction in claimed),
+            return_exceptions=True
+        )
+        
+        for interaction, outcome in zip(claimed, outcomes):
+            if isinstance(outcome, Exception):
+                results["errors"].append({
+                    "interaction_id": interaction["id"],
+                    "error": str(outcome)
+                })
+            elif outcome:
+                results["replies_generated"].append({
+                    "interaction_id": interaction["id"],
+                    "post_id": outcome
+                })
+        
+        return results
+    
+    async def arun(
+        self,
+        interval: float,
+        stop: asyncio.Event,
+        wake: Optional[asyncio.Event] = None
+    ) -> None:
+        """
+        Drain the interaction queue until stop is set.
+        
+        Claims batch after batch while there is work, then waits up to
+        interval seconds (or until wake is set) before checking again.
+        Once stop is set, finishes whatever is still claimable and returns.
+        
+        Args:
+            interval: Seconds to wait when there is nothing to claim
+            stop: Event that ends the loop
+            wake: Event set when new work was stored; must also be set on stop
+        """
+        while True:
+            try:
+                results = await self.arespond_once()
+            except Exception as e:
+                logger.error("[Mastodon] Error in responder cycle: %s", e)
+                results = {"claimed": []}
+            
+            if results["claimed"]:
+                continue
+            if stop.is_set():
+                return
+            try:
+                await asyncio.wait_for((wake or stop).wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            if wake is not None:
+                wake.clear()
+
+
+class MastodonListener:
+    """
+    Listener for Mastodon mentions and comments.
+    
+    Monitors timeline for interactions and can auto-reply. Fetching
+    (MastodonFetcher) and replying (MastodonResponder) are separate; when
+    polling they run as independent producer and consumer loops.
+    """
+    
+    def __init__(
+        self,
+        client: Optional[Mastodon] = None,
+        auto_reply: bool = False,
+        use_rag: bool = True,
+        poll_interval: int = 180,  # 3 minutes default
+        db_path: str = DEFAULT_DB_PATH,
+        max_concurrency: Optional[int] = None,
+        responder_interval: int = DEFAULT_RESPONDER_INTERVAL
+    ):
+        """
+        Initialize Mastodon listener.
+        
+        Args:
+            client: Mastodon client (defaults to creating one from env)
+            auto_reply: Whether to automatically post replies (vs save as draft)
+            use_rag: Whether to use RAG for generating replies
+            poll_interval: How often to check for new interactions (seconds)
+            db_path: Database path
+            max_concurrency: Max interactions processed concurrently
+                (defaults to MASTODON_MAX_CONCURRENCY env var, then 8)
+            responder_interval: How often an idle responder checks for work (seconds)
+        """
+        self.client = client or get_mastodon_client()
+        self.auto_reply = auto_reply
+        self.use_rag = use_rag
+        self.poll_interval = poll_interval
+        self.responder_interval = responder_interval
+        self.db_path = db_path
+        
+        # Adaptive polling: back off while idle, snap back on activity
+        self._min_interval = poll_interval
+        self._max_interval = max(poll_interval, MAX_POLL_INTERVAL)
+        self._current_interval = poll_interval
+        
+        # Set by wake() to cut the current poll wait short
+        self._wake = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_async: Optional[asyncio.Event] = None
+        
+        # Get our account info
+        self.account = get_account(self.client)
+        self.account_id = self.account["id"]
+        
+        db_write_lock = threading.Lock()
+        self.fetcher = MastodonFetcher(self.client, db_path=db_path, db_write_lock=db_write_lock)
+        self.responder = MastodonResponder(
+            self.client,
+            auto_reply=auto_reply,
+            use_rag=use_rag,
+            db_path=db_path,
+            max_concurrency=max_concurrency,
+            db_write_lock=db_write_lock
+        )
+    
+    async def ahandle_notifications(self, notifications: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Store new mentions, then reply to a batch of unresponded interactions.
+        
+        Args:
+            notifications: Notification dicts (from a poll or the stream)
+            
         Returns:
             Dict with results summary
         """
@@ -281,104 +768,251 @@ class MastodonListener:
         }
         
         try:
-            # Fetch recent mentions
-            mentions = self.fetch_mentions(limit=20)
+            stored = self.fetcher.store_notifications(notifications)
+            results["new_interactions"] = stored["new_interactions"]
+            results["errors"].extend(stored["errors"])
             
-            for status in mentions:
-                try:
-                    # Store in database (will skip if already exists)
-                    interaction_id = self.store_interaction(status)
-                    
-                    if interaction_id:
-                        results["new_interactions"].append({
-                            "id": interaction_id,
-                            "author": status["account"]["acct"],
-                            "mastodon_id": status["id"]
-                        })
-                        
-                except Exception as e:
-                    results["errors"].append({
-                        "status_id": status.get("id"),
-                        "error": str(e)
-                    })
-            
-            # Process unresponded interactions
-            unresponded = get_unresponded_interactions(limit=5, db_path=self.db_path)
-            
-            for interaction in unresponded:
-                try:
-                    post_id = self.process_interaction(
-                        interaction_id=interaction["id"],
-                        mastodon_id=interaction["mastodon_id"],
-                        content=interaction["content"],
-                        author=interaction["author_account"]
-                    )
-                    
-                    if post_id:
-                        results["replies_generated"].append({
-                            "interaction_id": interaction["id"],
-                            "post_id": post_id
-                        })
-                        
-                except Exception as e:
-                    results["errors"].append({
-                        "interaction_id": interaction["id"],
-                        "error": str(e)
-                    })
+            replied = await self.responder.arespond_once()
+            results["replies_generated"] = replied["replies_generated"]
+            results["errors"].extend(replied["errors"])
             
         except Exception as e:
-            print(f"[Mastodon] Error in poll cycle: {e}")
+            logger.error("[Mastodon] Error in poll cycle: %s", e)
             results["errors"].append({"general": str(e)})
         
         return results
     
-    def start_polling(self, max_iterations: Optional[int] = None):
+    async def apoll_once(self) -> Dict[str, Any]:
         """
-        Start continuous polling for Mastodon interactions.
+        Poll for new interactions once, replying to them concurrently.
+        
+        Returns:
+            Dict with results summary
+        """
+        notifications = await asyncio.to_thread(self.fetcher.fetch_notifications, limit=20)
+        return await self.ahandle_notifications(notifications)
+    
+    def poll_once(self) -> Dict[str, Any]:
+        """
+        Poll for new interactions once.
+        
+        Returns:
+            Dict with results summary
+        """
+        return asyncio.run(self.apoll_once())
+    
+    def _print_summary(self, results: Dict[str, Any]) -> None:
+        if results.get("new_interactions"):
+            logger.info("[Mastodon] Found %d new interaction(s)", len(results["new_interactions"]))
+        if results.get("replies_generated"):
+            logger.info("[Mastodon] Generated %d reply(ies)", len(results["replies_generated"]))
+        if results.get("errors"):
+            logger.warning("[Mastodon] Errors: %d", len(results["errors"]))
+        
+        if not results.get("new_interactions") and not results.get("replies_generated"):
+            logger.info("[Mastodon] No new interactions")
+    
+    def start_streaming(self, max_events: Optional[int] = None):
+        """
+        Handle mentions as they arrive over the streaming API.
+        
+        Subscribes to the user stream instead of re-fetching notifications
+        every poll_interval. One catch-up poll runs on connect and after
+        each reconnect; if the stream can't be opened or dies for good,
+        falls back to start_polling().
         
         Args:
-            max_iterations: Max poll cycles (None = infinite)
+            max_events: Max mention events to handle (None = infinite)
         """
-        print(f"[Mastodon] Starting listener for @{self.account['acct']}")
-        print(f"[Mastodon] Poll interval: {self.poll_interval}s")
-        print(f"[Mastodon] Auto-reply: {self.auto_reply}")
-        print(f"[Mastodon] Use RAG: {self.use_rag}")
+        logger.info("[Mastodon] Streaming notifications for @%s", self.account["acct"])
+        logger.info("[Mastodon] Auto-reply: %s", self.auto_reply)
+        logger.info("[Mastodon] Use RAG: %s", self.use_rag)
         
-        iteration = 0
+        notifications: "queue.Queue[Any]" = queue.Queue()
+        try:
+            handle = self.client.stream_user(
+                _NotificationQueue(notifications),
+                run_async=True,
+                reconnect_async=True
+            )
+        except Exception as e:
+            logger.warning("[Mastodon] Streaming unavailable (%s); falling back to polling", e)
+            self.start_polling()
+            return
+        
+        # Catch up on anything that arrived before the stream was open
+        self._print_summary(self.poll_once())
+        
+        was_receiving = True
+        handled = 0
         
         try:
             while True:
-                iteration += 1
-                print(f"\n[Mastodon] Poll #{iteration} at {datetime.now(timezone.utc).isoformat()}")
+                try:
+                    notification = notifications.get(timeout=STREAM_HEALTH_CHECK_SECONDS)
+                except queue.Empty:
+                    notification = None
                 
-                results = self.poll_once()
+                if not handle.is_alive():
+                    logger.warning("[Mastodon] Stream closed; falling back to polling")
+                    self.start_polling()
+                    return
                 
-                # Print summary
-                if results["new_interactions"]:
-                    print(f"[Mastodon] Found {len(results['new_interactions'])} new interaction(s)")
-                if results["replies_generated"]:
-                    print(f"[Mastodon] Generated {len(results['replies_generated'])} reply(ies)")
-                if results["errors"]:
-                    print(f"[Mastodon] Errors: {len(results['errors'])}")
+                receiving = handle.is_receiving()
+                if receiving and not was_receiving:
+                    logger.info("[Mastodon] Stream reconnected; catching up")
+                    self._print_summary(self.poll_once())
+                was_receiving = receiving
+                
+                if notification is None:
+                    continue
+                status = notification.get("status")
+                if notification.get("type") != "mention" or not status:
+                    # Nothing to store; just move the cursor past it
+                    try:
+                        self.fetcher.store_notifications([notification])
+                    except Exception as e:
+                        logger.error("[Mastodon] Error saving notification cursor: %s", e)
+                    continue
                 
-                if not results["new_interactions"] and not results["replies_generated"]:
-                    print("[Mastodon] No new interactions")
+                logger.info("[Mastodon] Mention from @%s at %s", status["account"]["acct"], datetime.now(timezone.utc).isoformat())
+                self._print_summary(asyncio.run(self.ahandle_notifications([notification])))
+                
+                handled += 1
+                if max_events and handled >= max_events:
+                    logger.info("[Mastodon] Reached max events (%d)", max_events)
+                    break
+                
+        except KeyboardInterrupt:
+            logger.info("[Mastodon] Listener stopped by user")
+        finally:
+            handle.close()
+    
+    def _next_interval(self, results: Dict[str, Any]) -> int:
+        """Reset the interval after activity, otherwise double it up to the cap."""
+        if results.get("new_interactions") or results.get("replies_generated"):
+            self._current_interval = self._min_interval
+        else:
+            self._current_interval = min(self._max_interval, self._current_interval * 2)
+        return self._current_interval
+    
+    def wake(self, *_: Any) -> None:
+        """
+        Poll now instead of waiting out the current interval.
+        
+        Safe to call from any thread, e.g. right after publishing a post so
+        replies to it are picked up immediately. Also resets the idle backoff.
+        """
+        self._wake.set()
+        loop, wake_async = self._loop, self._wake_async
+        if loop is not None and wake_async is not None:
+            try:
+                loop.call_soon_threadsafe(wake_async.set)
+            except RuntimeError:
+                # Loop already closed; the threading.Event is picked up next run
+                pass
+    
+    async def _wait_or_wake(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds; returns True if woken early."""
+        try:
+            await asyncio.wait_for(self._wake_async.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._wake_async.clear()
+            self._wake.clear()
+        return True
+    
+    async def _apoll_loop(
+        self,
+        max_iterations: Optional[int],
+        stop: asyncio.Event,
+        work: asyncio.Event
+    ) -> None:
+        """Fetch on the adaptive schedule; sets stop when done."""
+        iteration = 0
+        try:
+            while True:
+                iteration += 1
+                logger.info("[Mastodon] Poll #%d at %s", iteration, datetime.now(timezone.utc).isoformat())
+                
+                try:
+                    results = await asyncio.to_thread(self.fetcher.fetch_once)
+                except Exception as e:
+                    # e.g. a locked database; the cursor hasn't moved, so the
+                    # next poll retries on the usual (backed-off) schedule
+                    logger.error("[Mastodon] Error in poll cycle: %s", e)
+                    results = {"new_interactions": [], "errors": [{"general": str(e)}]}
+                self._print_summary(results)
+                if results["new_interactions"]:
+                    work.set()
                 
                 # Check if we should stop
                 if max_iterations and iteration >= max_iterations:
-                    print(f"[Mastodon] Reached max iterations ({max_iterations})")
+                    logger.info("[Mastodon] Reached max iterations (%d)", max_iterations)
                     break
                 
                 # Wait for next poll
-                time.sleep(self.poll_interval)
-                
+                interval = self._next_interval(results)
+                if interval != self._min_interval:
+                    logger.info("[Mastodon] Idle; next poll in %ds", interval)
+                if await self._wait_or_wake(interval):
+                    logger.info("[Mastodon] Woken; polling now")
+                    self._current_interval = self._min_interval
+        finally:
+            stop.set()
+            work.set()
+    
+    async def arun(self, max_iterations: Optional[int] = None) -> None:
+        """
+        Run the fetcher and responder loops side by side.
+        
+        The fetcher only stores mentions; the responder drains them from
+        the database at up to max_concurrency at a time, starting as soon
+        as the fetcher stores something.
+        """
+        stop = asyncio.Event()
+        work = asyncio.Event()
+        self._wake_async = asyncio.Event()
+        if self._wake.is_set():
+            self._wake_async.set()
+        self._loop = asyncio.get_running_loop()
+        add_post_callback(self.wake)
+        try:
+            await asyncio.gather(
+                self._apoll_loop(max_iterations, stop, work),
+                self.responder.arun(self.responder_interval, stop, wake=work)
+            )
+        finally:
+            remove_post_callback(self.wake)
+            self._loop = None
+    
+    def start_polling(self, max_iterations: Optional[int] = None):
+        """
+        Start continuous polling for Mastodon interactions.
+        
+        Waits poll_interval seconds after a poll that found something and
+        doubles the wait after each idle poll, capped at MAX_POLL_INTERVAL.
+        Replies are sent by a separate responder loop.
+        
+        Args:
+            max_iterations: Max poll cycles (None = infinite)
+        """
+        logger.info("[Mastodon] Starting listener for @%s", self.account["acct"])
+        logger.info("[Mastodon] Poll interval: %ds", self.poll_interval)
+        logger.info("[Mastodon] Auto-reply: %s", self.auto_reply)
+        logger.info("[Mastodon] Use RAG: %s", self.use_rag)
+        
+        try:
+            asyncio.run(self.arun(max_iterations))
         except KeyboardInterrupt:
-            print("\n[Mastodon] Listener stopped by user")
+            logger.info("[Mastodon] Listener stopped by user")
 
 
 def run_mastodon_listener(
     auto_reply: bool = False,
-    poll_interval: int = 180
+    poll_interval: int = 180,
+    stream: bool = False
 ):
     """
     Convenience function to run the Mastodon listener.
@@ -386,6 +1020,7 @@ def run_mastodon_listener(
     Args:
         auto_reply: Whether to auto-post replies (vs draft)
         poll_interval: Poll interval in seconds
+        stream: Use the streaming API instead of polling
     """
     listener = MastodonListener(
         auto_reply=auto_reply,
@@ -393,12 +1028,18 @@ def run_mastodon_listener(
         poll_interval=poll_interval
     )
     
-    listener.start_polling()
+    if stream:
+        listener.start_streaming()
+    else:
+        listener.start_polling()
 
 
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.INFO)
+    
     if len(sys.argv) > 1:
         if sys.argv[1] == "check":
             # Check for new mentions once
@@ -418,6 +1059,10 @@ if __name__ == "__main__":
             interval = int(sys.argv[2]) if len(sys.argv) > 2 else 180
             run_mastodon_listener(auto_reply=False, poll_interval=interval)
         
+        elif sys.argv[1] == "stream":
+            # Handle mentions from the streaming API (draft mode)
+            run_mastodon_listener(auto_reply=False, stream=True)
+        
         elif sys.argv[1] == "listen-auto":
             # Start continuous polling (auto-reply mode)
             interval = int(sys.argv[2]) if len(sys.argv) > 2 else 180
@@ -435,4 +1080,5 @@ if __name__ == "__main__":
         print("Usage:")
         print("  python mastodon_listener.py check              - Check for mentions once")
         print("  python mastodon_listener.py listen [interval]  - Start polling (draft mode)")
+        print("  python mastodon_listener.py stream             - Stream mentions (draft mode)")
         print("  python mastodon_listener.py listen-auto [interval]  - Start polling (auto-reply mode)")
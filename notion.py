@@ -1,30 +1,117 @@
 import requests
 import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-def get_brand_docs():
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+# Length of the excerpt used where the full docs would crowd the prompt
+BRAND_DOCS_SHORT_CHARS = 500
+
+# Brand docs change rarely; cache them per (api key, page id) for this long
+DEFAULT_CACHE_TTL = 3600
+
+_brand_docs_cache: Dict[Tuple[str, str], Tuple[float, "BrandDocs"]] = {}
+# ETag / Last-Modified of the cached response, for revalidating once the TTL lapses
+_brand_docs_validators: Dict[Tuple[str, str], Dict[str, str]] = {}
+_session: Optional[requests.Session] = None
+
+# Shared stand-in for a block without a payload dict; never mutated
+_EMPTY: Dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class BrandDocs:
+    """
+    Brand documentation fetched from Notion.
+
+    The derived views are computed once at fetch time so prompt builders
+    don't re-slice the full text on every LLM call. str() gives the full text.
+    """
+    full: str
+    short: str
+    chunks: List[str]
+
+    @classmethod
+    def from_chunks(cls, chunks: List[str]) -> "BrandDocs":
+        full = "\n".join(chunks)
+        return cls(full=full, short=full[:BRAND_DOCS_SHORT_CHARS], chunks=chunks)
+
+    def __str__(self) -> str:
+        return self.full
+
+
+def extract_block_text(blocks: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    Plain text of every rich_text run in the blocks, in order.
+
+    Hot for long pages: one dict lookup per block and a bound append.
+    """
+    text_chunks: List[str] = []
+    append = text_chunks.append
+    for block in blocks:
+        rich_text = block.get(block["type"], _EMPTY).get("rich_text")
+        if rich_text:
+            for rt in rich_text:
+                append(rt["plain_text"])
+    return text_chunks
+
+
+def _get_session() -> requests.Session:
+    """Shared session so repeated fetches reuse the TLS connection to Notion."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def get_brand_docs(*, force_refresh: bool = False) -> BrandDocs:
     """
     Fetches blocks from a Notion page and turns them into plain text.
+
+    Results are cached in-process for NOTION_CACHE_TTL seconds (default
+    3600); pass force_refresh=True to bypass the cache. Once the TTL lapses
+    the cached copy is revalidated with a conditional GET, so an unchanged
+    page costs a 304 instead of a full download.
     """
     NOTION_API_KEY = os.getenv("NOTION_API_KEY")
     NOTION_PAGE_ID = os.getenv("NOTION_PAGE_ID")
 
+    cache_key = (NOTION_API_KEY or "", NOTION_PAGE_ID or "")
+    cached = _brand_docs_cache.get(cache_key)
+    if cached and not force_refresh and cached[0] > time.monotonic():
+        return cached[1]
+
     HEADERS = {
         "Authorization": f"Bearer {NOTION_API_KEY}",
         "Notion-Version": "2022-06-28",
         "Content-Type": "application/json",
     }
 
+    validators = _brand_docs_validators.get(cache_key, {})
+    if cached and not force_refresh:
+        if "ETag" in validators:
+            HEADERS["If-None-Match"] = validators["ETag"]
+        if "Last-Modified" in validators:
+            HEADERS["If-Modified-Since"] = validators["Last-Modified"]
+
+    ttl = float(os.getenv("NOTION_CACHE_TTL", DEFAULT_CACHE_TTL))
     url = f"https://api.notion.com/v1/blocks/{NOTION_PAGE_ID}/children"
-    response = requests.get(url, headers=HEADERS)
+    response = _get_session().get(url, headers=HEADERS)
+    if response.status_code == 304 and cached:
+        _brand_docs_cache[cache_key] = (time.monotonic() + ttl, cached[1])
+        return cached[1]
     response.raise_for_status()
+    _brand_docs_validators[cache_key] = {
+        k: response.headers[k] for k in ("ETag", "Last-Modified") if k in response.headers
+    }
 
-    blocks = response.json()["results"]
-    text_chunks = []
-
-    for block in blocks:
-        block_type = block["type"]
-        if "rich_text" in block[block_type]:
-            for rt in block[block_type]["rich_text"]:
-                text_chunks.append(rt["plain_text"])
-
-    return "\n".join(text_chunks)
+    # orjson parses straight from the response bytes, well ahead of stdlib json
+    payload = orjson.loads(response.content) if orjson else response.json()
+    docs = BrandDocs.from_chunks(extract_block_text(payload["results"]))
+    _brand_docs_cache[cache_key] = (time.monotonic() + ttl, docs)
+    return docs
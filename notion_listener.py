@@ -8,11 +8,14 @@ This module provides functionality to:
 """
 import os
 import time
+import asyncio
 import requests
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime, timezone
 
-from notion import get_brand_docs
+from notion import get_brand_docs, extract_block_text
 from rag import sync_notion_document_to_rag
 from llm import generate_social_post
 from database import (
@@ -24,6 +27,16 @@ from database import (
 )
 
 
+# Idle polls back off exponentially up to this multiple of poll_interval
+MAX_POLL_INTERVAL_FACTOR = 4
+
+# Max blocks per children request (Notion's limit)
+BLOCKS_PAGE_SIZE = 100
+
+# Notion allows ~3 requests/s per integration; don't overlap more pages than that
+DEFAULT_MAX_CONCURRENCY = 3
+
+
 class NotionListener:
     """
     Listener for Notion page changes.
@@ -37,7 +50,8 @@ class NotionListener:
         poll_interval: int = 300,  # 5 minutes default
         auto_generate_posts: bool = True,
         use_rag: bool = True,
-        db_path: str = DEFAULT_DB_PATH
+        db_path: str = DEFAULT_DB_PATH,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
     ):
         """
         Initialize Notion listener.
@@ -48,12 +62,19 @@ class NotionListener:
             auto_generate_posts: Whether to auto-generate posts on change
             use_rag: Whether to use RAG when generating posts
             db_path: Database path
+            max_concurrency: Max pages processed concurrently per poll
         """
         self.api_key = api_key or os.getenv("NOTION_API_KEY")
         self.poll_interval = poll_interval
         self.auto_generate_posts = auto_generate_posts
         self.use_rag = use_rag
         self.db_path = db_path
+        self.max_concurrency = max_concurrency
+        
+        # Adaptive polling: back off while pages are idle, snap back on change
+        self._min_interval = poll_interval
+        self._max_interval = poll_interval * MAX_POLL_INTERVAL_FACTOR
+        self._current_interval = poll_interval
         
         if not self.api_key:
             raise ValueError("NOTION_API_KEY environment variable or api_key parameter required")
@@ -64,22 +85,37 @@ class NotionListener:
             "Content-Type": "application/json",
         }
         
+        # Keep-alive pool shared by every request (and worker thread); retries
+        # back off on 429/5xx and honour Retry-After
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        )
+        
         # Track last known state of pages
         self._last_modified: Dict[str, str] = {}
     
-    def fetch_page_content(self, page_id: str) -> Dict[str, Any]:
+    def fetch_page_metadata(self, page_id: str) -> Dict[str, str]:
         """
-        Fetch page content from Notion.
+        Fetch only the page object: a cheap call used to detect changes.
         
         Args:
             page_id: Notion page ID
             
         Returns:
-            Dict with 'content', 'title', 'last_edited_time'
+            Dict with 'title', 'last_edited_time'
         """
-        # Get page metadata
         page_url = f"https://api.notion.com/v1/pages/{page_id}"
-        page_response = requests.get(page_url, headers=self.headers)
+        page_response = self._session.get(page_url)
         page_response.raise_for_status()
         page_data = page_response.json()
         
@@ -88,35 +124,66 @@ class NotionListener:
         # Extract title if available
         title = ""
         properties = page_data.get("properties", {})
-        for prop_name, prop_data in properties.items():
+        for prop_data in properties.values():
             if prop_data.get("type") == "title":
-                title_array = prop_data.get("title", [])
+                title_array = prop_data.get("title")
                 if title_array:
                     title = title_array[0].get("plain_text", "")
                 break
         
-        # Get page blocks (content)
-        blocks_url = f"https://api.notion.com/v1/blocks/{page_id}/children"
-        blocks_response = requests.get(blocks_url, headers=self.headers)
-        blocks_response.raise_for_status()
-        
-        blocks = blocks_response.json()["results"]
-        text_chunks = []
-        
-        for block in blocks:
-            block_type = block["type"]
-            if "rich_text" in block.get(block_type, {}):
-                for rt in block[block_type]["rich_text"]:
-                    text_chunks.append(rt["plain_text"])
-        
-        content = "\n".join(text_chunks)
-        
         return {
-            "content": content,
             "title": title or f"Notion Page {page_id}",
             "last_edited_time": last_edited
         }
     
+    def fetch_page_blocks(self, page_id: str) -> str:
+        """
+        Fetch the page's blocks and flatten them to plain text.
+        
+        Args:
+            page_id: Notion page ID
+            
+        Returns:
+            Page content as text
+        """
+        return "\n".join(extract_block_text(self._iter_blocks(page_id)))
+    
+    def _iter_blocks(self, page_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a page's top-level blocks, following next_cursor.
+        
+        Notion returns at most 100 blocks per response; without paging,
+        long pages were silently truncated. Only one response is held at
+        a time.
+        """
+        blocks_url = f"https://api.notion.com/v1/blocks/{page_id}/children"
+        params: Dict[str, Any] = {"page_size": BLOCKS_PAGE_SIZE}
+        
+        while True:
+            blocks_response = self._session.get(blocks_url, params=params)
+            blocks_response.raise_for_status()
+            data = blocks_response.json()
+            
+            yield from data["results"]
+            
+            if not data.get("has_more") or not data.get("next_cursor"):
+                break
+            params["start_cursor"] = data["next_cursor"]
+    
+    def fetch_page_content(self, page_id: str) -> Dict[str, Any]:
+        """
+        Fetch page content from Notion.
+        
+        Args:
+            page_id: Notion page ID
+            
+        Returns:
+            Dict with 'content', 'title', 'last_edited_time'
+        """
+        page_data: Dict[str, Any] = dict(self.fetch_page_metadata(page_id))
+        page_data["content"] = self.fetch_page_blocks(page_id)
+        return page_data
+    
     def has_page_changed(self, page_id: str, last_edited_time: str) -> bool:
         """
         Check if a page has changed since we last saw it.
@@ -133,7 +200,12 @@ class NotionListener:
         
         return self._last_modified[page_id] != last_edited_time
     
-    def sync_page(self, page_id: str, force: bool = False) -> Optional[Dict[str, Any]]:
+    def sync_page(
+        self,
+        page_id: str,
+        force: bool = False,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Sync a Notion page to the local system.
         
@@ -142,17 +214,21 @@ class NotionListener:
         Args:
             page_id: Notion page ID
             force: Force sync even if page hasn't changed
+            metadata: Page metadata already fetched by the caller
             
         Returns:
-            Dict with sync results or None if no changes
+            Dict with sync results (including the fetched 'page_data')
+            or None if no changes
         """
         try:
-            page_data = self.fetch_page_content(page_id)
+            page_data: Dict[str, Any] = dict(metadata or self.fetch_page_metadata(page_id))
             
-            # Check if changed
+            # Check if changed before paying for the blocks request
             if not force and not self.has_page_changed(page_id, page_data["last_edited_time"]):
                 return None
             
+            page_data["content"] = self.fetch_page_blocks(page_id)
+            
             print(f"[Notion] Syncing page '{page_data['title']}'...")
             
             # Sync to RAG system
@@ -177,26 +253,35 @@ class NotionListener:
                 "title": page_data["title"],
                 "doc_id": doc_id,
                 "chunk_count": len(chunk_ids),
-                "last_edited": page_data["last_edited_time"]
+                "last_edited": page_data["last_edited_time"],
+                # Title + content, so callers can reuse them without refetching
+                "page_data": page_data
             }
             
         except Exception as e:
             print(f"[Notion] Error syncing page {page_id}: {e}")
             return None
     
-    def generate_post_from_update(self, page_id: str) -> Optional[int]:
+    def generate_post_from_update(
+        self,
+        page_id: str,
+        page_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
         """
         Generate a social media post from a page update.
         
         Args:
             page_id: Notion page ID
+            page_data: Title and content already fetched (e.g. by sync_page);
+                fetched from Notion when omitted
             
         Returns:
             Post ID if generated, None otherwise
         """
         try:
-            # Fetch current content
-            page_data = self.fetch_page_content(page_id)
+            # Fetch current content unless the caller already has it
+            if page_data is None:
+                page_data = self.fetch_page_content(page_id)
             
             print(f"[Notion] Generating post from '{page_data['title']}'...")
             
@@ -225,9 +310,26 @@ class NotionListener:
             print(f"[Notion] Error generating post: {e}")
             return None
     
-    def poll_once(self, page_ids: List[str]) -> Dict[str, Any]:
+    def _process_changed_page(self, page_id: str, metadata: Dict[str, str]) -> Dict[str, Any]:
+        """Sync one changed page and, if enabled, draft a post from it."""
+        outcome: Dict[str, Any] = {"sync": None, "post_id": None}
+        outcome["sync"] = self.sync_page(page_id, force=True, metadata=metadata)
+        if outcome["sync"]:
+            # Keep the page content out of the poll summary
+            page_data = outcome["sync"].pop("page_data")
+            if self.auto_generate_posts:
+                outcome["post_id"] = self.generate_post_from_update(page_id, page_data=page_data)
+        return outcome
+    
+    async def apoll_once(self, page_ids: List[str]) -> Dict[str, Any]:
         """
-        Poll Notion pages once for changes.
+        Poll Notion pages once for changes, overlapping requests across pages.
+        
+        Metadata for every page is fetched concurrently first; only pages
+        whose last_edited_time moved go on to the (heavier) blocks fetch,
+        RAG sync and post generation, also concurrently. The HTTP and
+        LLM clients are blocking, so each step runs in a worker thread,
+        at most max_concurrency at a time.
         
         Args:
             page_ids: List of Notion page IDs to check
@@ -241,35 +343,77 @@ class NotionListener:
             "errors": []
         }
         
-        for page_id in page_ids:
-            try:
-                # Sync the page
-                sync_result = self.sync_page(page_id)
-                
-                if sync_result:
-                    results["synced"].append(sync_result)
-                    
-                    # Auto-generate post if enabled
-                    if self.auto_generate_posts:
-                        post_id = self.generate_post_from_update(page_id)
-                        if post_id:
-                            results["posts_generated"].append({
-                                "page_id": page_id,
-                                "post_id": post_id
-                            })
-                
-            except Exception as e:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def bounded(fn, *args):
+            async with semaphore:
+                return await asyncio.to_thread(fn, *args)
+        
+        metadata = await asyncio.gather(
+            *(bounded(self.fetch_page_metadata, page_id) for page_id in page_ids),
+            return_exceptions=True
+        )
+        
+        changed = []
+        for page_id, meta in zip(page_ids, metadata):
+            if isinstance(meta, Exception):
                 results["errors"].append({
                     "page_id": page_id,
-                    "error": str(e)
+                    "error": str(meta)
+                })
+            elif self.has_page_changed(page_id, meta["last_edited_time"]):
+                changed.append((page_id, meta))
+        
+        outcomes = await asyncio.gather(
+            *(bounded(self._process_changed_page, page_id, meta) for page_id, meta in changed),
+            return_exceptions=True
+        )
+        
+        for (page_id, _), outcome in zip(changed, outcomes):
+            if isinstance(outcome, Exception):
+                results["errors"].append({
+                    "page_id": page_id,
+                    "error": str(outcome)
+                })
+                continue
+            if outcome["sync"]:
+                results["synced"].append(outcome["sync"])
+            if outcome["post_id"]:
+                results["posts_generated"].append({
+                    "page_id": page_id,
+                    "post_id": outcome["post_id"]
                 })
         
         return results
     
+    def poll_once(self, page_ids: List[str]) -> Dict[str, Any]:
+        """
+        Poll Notion pages once for changes.
+        
+        Args:
+            page_ids: List of Notion page IDs to check
+            
+        Returns:
+            Dict with results summary
+        """
+        return asyncio.run(self.apoll_once(page_ids))
+    
+    def _next_interval(self, results: Dict[str, Any]) -> int:
+        """Reset the interval after a change, double it after an idle poll."""
+        if results["synced"] or results["posts_generated"]:
+            self._current_interval = self._min_interval
+        elif not results["errors"]:
+            self._current_interval = min(self._max_interval, self._current_interval * 2)
+        return self._current_interval
+    
     def start_polling(self, page_ids: List[str], max_iterations: Optional[int] = None):
         """
         Start continuous polling of Notion pages.
         
+        Waits poll_interval seconds after a poll that synced something and
+        doubles the wait after each idle poll, up to MAX_POLL_INTERVAL_FACTOR
+        times poll_interval.
+        
         Args:
             page_ids: List of Notion page IDs to monitor
             max_iterations: Max poll cycles (None = infinite)
@@ -307,7 +451,10 @@ class NotionListener:
                     break
                 
                 # Wait for next poll
-                time.sleep(self.poll_interval)
+                interval = self._next_interval(results)
+                if interval != self._min_interval:
+                    print(f"[Notion] Idle; next poll in {interval}s")
+                time.sleep(interval)
                 
         except KeyboardInterrupt:
             print("\n[Notion] Listener stopped by user")
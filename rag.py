@@ -5,14 +5,25 @@ Handles document chunking, embedding generation, storage, and retrieval.
 """
 import os
 import json
-import pickle
+import struct
+import sqlite3
+import time
+import hashlib
+import threading
 import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional, Tuple
 from openai import OpenAI
 
+import rag_index
+
+try:
+    import sqlite_vec  # type: ignore
+except ImportError:
+    sqlite_vec = None  # type: ignore
 from chunking import chunk_document, Chunk, ChunkingStrategy
 from database import (
-    save_document_chunk,
+    save_document_chunks_bulk,
     get_document_chunks,
     save_notion_document,
     get_db,
@@ -28,35 +39,195 @@ def _get_embedding_client() -> OpenAI:
     )
 
 
-def generate_embedding(text: str, model: str = "text-embedding-3-small") -> np.ndarray:
+# Max texts per embeddings request; keeps each request under provider token limits
+EMBEDDING_BATCH_SIZE = 96
+
+# Embedding requests in flight at once per document; stays within OpenRouter concurrency
+EMBEDDING_MAX_WORKERS = 4
+
+
+class EmbeddingRateLimiter:
     """
-    Generate an embedding vector for the given text.
+    Leaky-bucket gate that spaces embedding requests under a per-minute cap.
+    
+    acquire() reserves the next free slot and sleeps until it, so concurrent
+    callers go out evenly instead of bursting into 429s and backing off.
+    After an idle spell up to `burst` requests may go back to back.
+    """
+    
+    def __init__(self, per_minute: int, burst: int = 1):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.burst = max(burst, 1)
+        self._lock = threading.Lock()
+        # Time at which the bucket drains back to empty
+        self._drained_at = 0.0
+    
+    def acquire(self, weight: int = 1) -> None:
+        """Block until `weight` requests may be sent."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._drained_at - (self.burst - 1) * self.interval)
+            self._drained_at = max(self._drained_at, send_at) + weight * self.interval
+        delay = send_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Shared by every embedding call in the process; EMBEDDING_RPM=0 disables it
+embedding_rate_limiter = EmbeddingRateLimiter(
+    int(os.getenv("EMBEDDING_RPM", "500")),
+    burst=EMBEDDING_MAX_WORKERS
+)
+
+
+# Calls currently running, by key; concurrent callers with the same key share one
+_inflight: Dict[Any, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _coalesce(key: Any, fn):
+    """
+    Run fn() once for all concurrent callers passing the same key.
+    
+    The first caller does the work; the others block on its Future and get
+    the same result (or exception). Nothing is cached once the call ends.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+    if not owner:
+        return future.result()
+    
+    try:
+        result = fn()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _clean_embedding_text(text: str) -> str:
+    return text.replace("\n", " ").strip()
+
+
+def generate_embeddings(texts: List[str], model: str = "text-embedding-3-small") -> np.ndarray:
+    """
+    Generate embedding vectors for several texts in one request.
     
     Args:
-        text: Text to embed
+        texts: Texts to embed (at most EMBEDDING_BATCH_SIZE is advisable)
         model: Embedding model to use (OpenAI compatible)
         
     Returns:
-        Numpy array of embedding values
+        Numpy array of shape (len(texts), dim), rows in input order
     """
     client = _get_embedding_client()
     
     # Clean up text
-    text = text.replace("\n", " ").strip()
-    if not text:
+    texts = [_clean_embedding_text(text) for text in texts]
+    if not texts or not all(texts):
         raise ValueError("Cannot generate embedding for empty text")
     
+    embedding_rate_limiter.acquire()
     try:
         response = client.embeddings.create(
-            input=[text],
+            input=texts,
             model=model
         )
-        embedding = response.data[0].embedding
-        return np.array(embedding, dtype=np.float32)
+        data = sorted(response.data, key=lambda d: d.index)
+        return np.array([d.embedding for d in data], dtype=np.float32)
     except Exception as e:
         raise RuntimeError(f"Failed to generate embedding: {e}") from e
 
 
+def generate_embedding(text: str, model: str = "text-embedding-3-small") -> np.ndarray:
+    """
+    Generate an embedding vector for the given text.
+    
+    Args:
+        text: Text to embed
+        model: Embedding model to use (OpenAI compatible)
+        
+    Returns:
+        Numpy array of embedding values
+    """
+    # Identical concurrent requests (e.g. the same query from two handlers) share one call
+    digest = hashlib.sha1(_clean_embedding_text(text).encode("utf-8")).hexdigest()
+    return _coalesce(
+        ("embedding", model, digest),
+        lambda: generate_embeddings([text], model=model)[0]
+    )
+
+
+# Stored embeddings: 4-byte little-endian float32 scale, then dim int8 values
+_SCALE_HEADER = struct.Struct("<f")
+
+
+def quantize_embedding(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Quantize an embedding to int8 with a per-vector scale.
+    
+    The vector is L2-normalized first (cosine similarity ignores length), so
+    value ~= q * scale / 127.
+    
+    Returns:
+        Tuple of (int8 array, float scale)
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector = vector / norm
+    scale = float(np.max(np.abs(vector))) or 1.0
+    q = np.round(vector / scale * 127).astype(np.int8)
+    return q, scale
+
+
+def encode_embedding(embedding: np.ndarray) -> bytes:
+    """Serialize an embedding for storage as a float32 scale plus int8 values."""
+    q, scale = quantize_embedding(embedding)
+    return _SCALE_HEADER.pack(scale) + q.tobytes()
+
+
+def decode_quantized_embedding(blob: bytes, dim: int) -> Optional[Tuple[np.ndarray, float]]:
+    """
+    Read a stored embedding as (int8 array, scale) without dequantizing.
+    
+    Raw float32 blobs from before quantization are quantized on the fly.
+    Returns None for anything else, e.g. a pickled embedding or one made
+    by a model with another dimension.
+    """
+    if len(blob) == _SCALE_HEADER.size + dim:
+        (scale,) = _SCALE_HEADER.unpack_from(blob)
+        return np.frombuffer(blob, dtype=np.int8, offset=_SCALE_HEADER.size), scale
+    if len(blob) == dim * 4:
+        return quantize_embedding(np.frombuffer(blob, dtype="<f4"))
+    return None
+
+
+def decode_embedding(blob: bytes, dim: int) -> Optional[np.ndarray]:
+    """
+    Read an embedding stored by encode_embedding as a float32 vector.
+    
+    Returns None when the blob isn't a dim-length embedding (see
+    decode_quantized_embedding).
+    """
+    decoded = decode_quantized_embedding(blob, dim)
+    if decoded is None:
+        return None
+    q, scale = decoded
+    return q.astype(np.float32) * np.float32(scale / 127)
+
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """
     Calculate cosine similarity between two vectors.
@@ -71,6 +242,188 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 
+# Decoded, normalized chunk embeddings per (db_path, source_type); see _get_or_load_matrix
+_EMBEDDING_CACHE: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+
+
+def _chunks_version(conn) -> Tuple[int, int]:
+    """Cheap stamp of document_chunks contents: (chunk count, max id)."""
+    return tuple(conn.execute(
+        "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM document_chunks"
+    ).fetchone())
+
+
+def _invalidate_embedding_cache(db_path: str) -> None:
+    """Drop every cached matrix for a database after its chunks change."""
+    for key in [k for k in _EMBEDDING_CACHE if k[0] == db_path]:
+        _EMBEDDING_CACHE.pop(key, None)
+
+
+# Rows dequantized per step when scoring; bounds the float32 scratch memory
+SIMILARITY_BLOCK_ROWS = 4096
+
+
+def _int8_similarities(matrix: np.ndarray, row_scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Cosine similarities of int8 rows against a unit query, block by block."""
+    query = query.astype(np.float32)
+    similarities = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), SIMILARITY_BLOCK_ROWS):
+        block = matrix[start:start + SIMILARITY_BLOCK_ROWS]
+        similarities[start:start + len(block)] = block.astype(np.float32) @ query
+    return similarities * row_scales
+
+
+def _get_or_load_matrix(db_path: str, source_type: Optional[str], dim: int) -> Dict[str, Any]:
+    """
+    Return the cached embedding matrix for a source type, reloading on change.
+    
+    The entry is keyed by (db_path, source_type) and stamped with the table's
+    chunk count and max id, so writes from another process are picked up too.
+    
+    Returns:
+        Dict with "matrix" (contiguous (N, dim) int8), "row_scales" (float32
+        factor turning a row's dot product into cosine similarity), "ids"
+        (chunk ids aligned with matrix), "skipped" (rows whose embedding didn't decode) and "version"
+    """
+    key = (db_path, source_type)
+    with get_db(db_path) as conn:
+        version = _chunks_version(conn)
+        
+        cached = _EMBEDDING_CACHE.get(key)
+        if cached and cached["version"] == version and cached["dim"] == dim:
+            return cached
+        
+        # Only ids and vectors: text and metadata are loaded for the top-k hits
+        if source_type:
+            rows = conn.execute("""
+                SELECT id, embedding
+                FROM document_chunks
+                WHERE source_type = ? AND embedding IS NOT NULL
+            """, (source_type,)).fetchall()
+        else:
+            rows = conn.execute("""
+                SELECT id, embedding
+                FROM document_chunks
+                WHERE embedding IS NOT NULL
+            """).fetchall()
+    
+    ids = np.empty(len(rows), dtype=np.int64)
+    matrix = np.empty((len(rows), dim), dtype=np.int8)
+    scales = np.empty(len(rows), dtype=np.float32)
+    count = 0
+    for chunk_id, blob in rows:
+        decoded = decode_quantized_embedding(blob, dim)
+        if decoded is None:
+            continue
+        matrix[count], scales[count] = decoded
+        ids[count] = chunk_id
+        count += 1
+    
+    # Fold dequantization and normalization into one factor per row:
+    # cosine = (q . query) * row_scale for a unit-length query
+    matrix = matrix[:count]
+    norms = np.linalg.norm(matrix.astype(np.float32), axis=1)
+    norms[norms == 0] = 1.0
+    
+    entry = {
+        "matrix": np.ascontiguousarray(matrix),
+        "row_scales": (1.0 / norms).astype(np.float32),
+        "ids": ids[:count],
+        "skipped": len(rows) - count,
+        "dim": dim,
+        "version": version,
+    }
+    _EMBEDDING_CACHE[key] = entry
+    return entry
+
+
+# Loaded ANN indexes per db_path; see _get_ann_index
+_ANN_INDEXES: Dict[str, "rag_index.ChunkIndex"] = {}
+
+# Serializes index rebuilds, in-place updates and saves across sync threads
+_ANN_LOCK = threading.Lock()
+
+
+def _get_ann_index(db_path: str, dim: int) -> Optional["rag_index.ChunkIndex"]:
+    """
+    Return an HNSW index over all chunks, or None to use the exact scan.
+    
+    None when hnswlib isn't installed or the table is below ANN_MIN_CHUNKS.
+    Reuses the loaded or persisted index while it matches the table's
+    version; otherwise rebuilds it from the stored embeddings and saves it.
+    """
+    if not rag_index.available():
+        return None
+    
+    with _ANN_LOCK:
+        return _load_or_build_ann_index(db_path, dim)
+
+
+def _load_or_build_ann_index(db_path: str, dim: int) -> Optional["rag_index.ChunkIndex"]:
+    with get_db(db_path) as conn:
+        # One read snapshot, so the version matches the rows we index
+        conn.execute("BEGIN")
+        version = _chunks_version(conn)
+        if version[0] < rag_index.ANN_MIN_CHUNKS:
+            return None
+        
+        index = _ANN_INDEXES.get(db_path)
+        if index is None or index.dim != dim:
+            index = rag_index.ChunkIndex.load(db_path, dim)
+        if index is not None and index.version == version:
+            _ANN_INDEXES[db_path] = index
+            return index
+        
+        rows = conn.execute(
+            "SELECT id, embedding FROM document_chunks WHERE embedding IS NOT NULL"
+        ).fetchall()
+    
+    ids = []
+    vectors = np.empty((len(rows), dim), dtype=np.float32)
+    for row in rows:
+        embedding = decode_embedding(row["embedding"], dim)
+        if embedding is not None:
+            vectors[len(ids)] = embedding
+            ids.append(row["id"])
+    
+    print(f"Building ANN index over {len(ids)} chunks...")
+    index = rag_index.ChunkIndex.build(vectors[:len(ids)], ids, version)
+    index.save(db_path)
+    _ANN_INDEXES[db_path] = index
+    return index
+
+
+def _update_ann_index(
+    db_path: str,
+    version_before: Tuple[int, int],
+    version_after: Tuple[int, int],
+    removed_ids: List[int],
+    added_ids: List[int],
+    added_vectors: List[np.ndarray]
+) -> None:
+    """
+    Apply one document's re-chunking to the persisted ANN index in place.
+    
+    version_before/version_after are the table's versions read inside the
+    write's transaction. Only applied when the index reflected the table
+    right before this write; a stale index (e.g. another document committed
+    in between) is left alone and gets rebuilt on its next query.
+    """
+    if not rag_index.available() or not added_vectors:
+        return
+    dim = added_vectors[0].shape[0]
+    with _ANN_LOCK:
+        index = _ANN_INDEXES.get(db_path) or rag_index.ChunkIndex.load(db_path, dim)
+        if index is None or index.dim != dim or index.version != version_before:
+            return
+        
+        index.remove(removed_ids)
+        index.add(np.stack(added_vectors), added_ids)
+        index.version = version_after
+        index.save(db_path)
+        _ANN_INDEXES[db_path] = index
+
+
 def chunk_and_embed_document(
     text: str,
     source_id: str,
@@ -93,53 +446,114 @@ def chunk_and_embed_document(
     Returns:
         List of chunk IDs that were saved to the database
     """
-    # First, delete existing chunks for this document
+    # Chunk the document
+    chunks = chunk_document(text, strategy=strategy, chunk_size=chunk_size)
+    batches = [
+        chunks[start:start + EMBEDDING_BATCH_SIZE]
+        for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE)
+    ]
+    
+    # Embed batches concurrently, EMBEDDING_MAX_WORKERS requests at a time
+    embedded: Dict[int, np.ndarray] = {}
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_WORKERS, len(batches))) as executor:
+            futures = {
+                executor.submit(generate_embeddings, [chunk.text for chunk in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    embeddings = future.result()
+                except Exception as e:
+                    print(f"Warning: Failed to embed chunks {batch[0].chunk_number}-{batch[-1].chunk_number}: {e}")
+                    continue
+                for chunk, embedding_vector in zip(batch, embeddings):
+                    embedded[chunk.chunk_number] = embedding_vector
+    
+    # Serialize embeddings as int8 with their scale, metadata as JSON
+    rows = [
+        (source_id, source_type, chunk.text, chunk.chunk_number, strategy,
+         encode_embedding(embedded[chunk.chunk_number]), json.dumps(chunk.metadata))
+        for chunk in chunks
+        if chunk.chunk_number in embedded
+    ]
+    
+    # Replace the document's chunks in one transaction: one commit, and readers
+    # never see the document half-written
     with get_db(db_path) as conn:
+        # Take the write lock up front, so both versions below bracket
+        # exactly this document's change
+        conn.execute("BEGIN IMMEDIATE")
+        version_before = _chunks_version(conn)
+        removed_ids = [row["id"] for row in conn.execute("""
+            SELECT id FROM document_chunks
+            WHERE source_id = ? AND source_type = ?
+        """, (source_id, source_type))]
         conn.execute("""
             DELETE FROM document_chunks
             WHERE source_id = ? AND source_type = ?
         """, (source_id, source_type))
+        
+        save_document_chunks_bulk(rows, conn=conn)
+        
+        # executemany doesn't report row ids; read them back in chunk order
+        saved = conn.execute("""
+            SELECT id, chunk_number FROM document_chunks
+            WHERE source_id = ? AND source_type = ?
+            ORDER BY chunk_number
+        """, (source_id, source_type)).fetchall()
+        version_after = _chunks_version(conn)
     
-    # Chunk the document
-    chunks = chunk_document(text, strategy=strategy, chunk_size=chunk_size)
-    
-    if not chunks:
-        return []
-    
-    chunk_ids = []
-    
-    # Generate embeddings and save each chunk
-    for chunk in chunks:
-        try:
-            # Generate embedding
-            embedding_vector = generate_embedding(chunk.text)
-            
-            # Serialize embedding as bytes
-            embedding_bytes = pickle.dumps(embedding_vector)
-            
-            # Serialize metadata as JSON
-            metadata_json = json.dumps(chunk.metadata)
-            
-            # Save to database
-            chunk_id = save_document_chunk(
-                source_id=source_id,
-                source_type=source_type,
-                chunk_text=chunk.text,
-                chunk_number=chunk.chunk_number,
-                chunk_strategy=strategy,
-                embedding=embedding_bytes,
-                metadata=metadata_json,
-                db_path=db_path
-            )
-            chunk_ids.append(chunk_id)
-            
-        except Exception as e:
-            print(f"Warning: Failed to process chunk {chunk.chunk_number}: {e}")
-            continue
+    chunk_ids = [row["id"] for row in saved]
+    chunk_vectors = [embedded[row["chunk_number"]] for row in saved]
     
+    _invalidate_embedding_cache(db_path)
+    _update_ann_index(db_path, version_before, version_after, removed_ids, chunk_ids, chunk_vectors)
     return chunk_ids
 
 
+def _chunk_result(row: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+    """Shape a document_chunks row into a retrieval result."""
+    try:
+        # Deserialize metadata
+        metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+    except ValueError as e:
+        print(f"Warning: Failed to process chunk {row['id']}: {e}")
+        metadata = {}
+    
+    return {
+        "id": row["id"],
+        "source_id": row["source_id"],
+        "source_type": row["source_type"],
+        "chunk_text": row["chunk_text"],
+        "chunk_number": row["chunk_number"],
+        "chunk_strategy": row["chunk_strategy"],
+        "metadata": metadata,
+        "similarity": float(similarity)
+    }
+
+
+def _fetch_chunk_results(db_path: str, ids: np.ndarray, similarities: np.ndarray) -> List[Dict[str, Any]]:
+    """Load the given chunk ids and return results in the order given."""
+    if not len(ids):
+        return []
+    placeholders = ",".join("?" * len(ids))
+    with get_db(db_path) as conn:
+        rows = conn.execute(f"""
+            SELECT id, source_id, source_type, chunk_text, chunk_number,
+                   chunk_strategy, metadata
+            FROM document_chunks
+            WHERE id IN ({placeholders})
+        """, [int(i) for i in ids]).fetchall()
+    by_id = {row["id"]: row for row in rows}
+    return [
+        _chunk_result(by_id[int(chunk_id)], similarity)
+        for chunk_id, similarity in zip(ids, similarities)
+        if int(chunk_id) in by_id
+    ]
+
+
 def retrieve_relevant_chunks(
     query: str,
     source_type: Optional[str] = None,
@@ -158,59 +572,132 @@ def retrieve_relevant_chunks(
     Returns:
         List of chunks with similarity scores, sorted by relevance
     """
-    # Generate embedding for the query
-    query_embedding = generate_embedding(query)
+    # Concurrent identical retrievals share one embedding call and scan
+    results = _coalesce(
+        ("retrieve", db_path, query, source_type, top_k),
+        lambda: _retrieve_relevant_chunks(query, source_type, top_k, db_path)
+    )
+    return [dict(result) for result in results]
+
+
+# None until the first attempt to load sqlite-vec, then whether it worked
+_sqlite_vec_loadable: Optional[bool] = None
+
+
+def _load_sqlite_vec(conn: sqlite3.Connection) -> bool:
+    """Load the sqlite-vec extension into conn; False when it isn't usable."""
+    global _sqlite_vec_loadable
+    if sqlite_vec is None or _sqlite_vec_loadable is False:
+        return False
+    try:
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
+    except (AttributeError, sqlite3.Error) as e:
+        # e.g. a Python build without extension loading
+        print(f"Warning: sqlite-vec unavailable, scanning embeddings in-process: {e}")
+        _sqlite_vec_loadable = False
+        return False
+    _sqlite_vec_loadable = True
+    return True
+
+
+def _sqlite_vec_search(
+    db_path: str,
+    query_embedding: np.ndarray,
+    source_type: Optional[str],
+    top_k: int
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Exact top-k computed inside SQLite by sqlite-vec's cosine distance.
+    
+    Works on the stored blobs directly: int8 rows skip their scale header
+    (cosine ignores scale) and legacy float32 rows are compared as float32.
+    Returns None when sqlite-vec can't be loaded.
+    """
+    dim = query_embedding.shape[0]
+    query_int8, _ = quantize_embedding(query_embedding)
+    params: Dict[str, Any] = {
+        "int8_len": _SCALE_HEADER.size + dim,
+        "f32_len": dim * 4,
+        "header": _SCALE_HEADER.size + 1,
+        "q8": query_int8.tobytes(),
+        "q32": np.ascontiguousarray(query_embedding, dtype="<f4").tobytes(),
+        "k": top_k,
+        "source_type": source_type,
+    }
+    source_filter = "AND source_type = :source_type" if source_type else ""
     
-    # Retrieve all chunks with embeddings
     with get_db(db_path) as conn:
-        if source_type:
-            rows = conn.execute("""
-                SELECT id, source_id, source_type, chunk_text, chunk_number,
-                       chunk_strategy, embedding, metadata
-                FROM document_chunks
-                WHERE source_type = ? AND embedding IS NOT NULL
-            """, (source_type,)).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT id, source_id, source_type, chunk_text, chunk_number,
-                       chunk_strategy, embedding, metadata
+        if not _load_sqlite_vec(conn):
+            return None
+        rows = conn.execute(f"""
+            SELECT id, distance FROM (
+                SELECT id, CASE length(embedding)
+                    WHEN :int8_len THEN vec_distance_cosine(
+                        vec_int8(substr(embedding, :header)), vec_int8(:q8))
+                    WHEN :f32_len THEN vec_distance_cosine(
+                        vec_f32(embedding), vec_f32(:q32))
+                END AS distance
                 FROM document_chunks
-                WHERE embedding IS NOT NULL
-            """).fetchall()
+                WHERE embedding IS NOT NULL {source_filter}
+            )
+            WHERE distance IS NOT NULL
+            ORDER BY distance
+            LIMIT :k
+        """, params).fetchall()
+    
+    ids = np.array([row["id"] for row in rows], dtype=np.int64)
+    similarities = np.array([1.0 - row["distance"] for row in rows], dtype=np.float32)
+    return _fetch_chunk_results(db_path, ids, similarities)
+
+
+def _retrieve_relevant_chunks(
+    query: str,
+    source_type: Optional[str],
+    top_k: int,
+    db_path: str
+) -> List[Dict[str, Any]]:
+    # Generate embedding for the query
+    query_embedding = generate_embedding(query)
+    
+    # Large unfiltered corpora: approximate search, then fetch just the hits
+    if source_type is None:
+        index = _get_ann_index(db_path, query_embedding.shape[0])
+        if index is not None:
+            try:
+                ids, similarities = index.query(query_embedding, top_k)
+            except RuntimeError as e:
+                print(f"Warning: ANN query failed, falling back to exact scan: {e}")
+            else:
+                return _fetch_chunk_results(db_path, ids, similarities)
     
-    if not rows:
+    # sqlite-vec installed: rank inside SQLite, only the top-k rows come back
+    results = _sqlite_vec_search(db_path, query_embedding, source_type, top_k)
+    if results is not None:
+        return results
+    
+    # Normalized embedding matrix, from the in-process cache when unchanged
+    cached = _get_or_load_matrix(db_path, source_type, query_embedding.shape[0])
+    
+    if cached["skipped"]:
+        print(f"Warning: Skipped {cached['skipped']} chunk(s) with embeddings in an old format; re-sync their documents to rebuild them")
+    if not len(cached["ids"]):
         return []
     
-    # Calculate similarity scores
-    results = []
-    for row in rows:
-        try:
-            # Deserialize embedding
-            chunk_embedding = pickle.loads(row["embedding"])
-            
-            # Calculate similarity
-            similarity = cosine_similarity(query_embedding, chunk_embedding)
-            
-            # Deserialize metadata
-            metadata = json.loads(row["metadata"]) if row["metadata"] else {}
-            
-            results.append({
-                "id": row["id"],
-                "source_id": row["source_id"],
-                "source_type": row["source_type"],
-                "chunk_text": row["chunk_text"],
-                "chunk_number": row["chunk_number"],
-                "chunk_strategy": row["chunk_strategy"],
-                "metadata": metadata,
-                "similarity": float(similarity)
-            })
-        except Exception as e:
-            print(f"Warning: Failed to process chunk {row['id']}: {e}")
-            continue
+    # Cosine similarity for all chunks in one matrix-vector product
+    query_norm = np.linalg.norm(query_embedding) or 1.0
+    similarities = _int8_similarities(cached["matrix"], cached["row_scales"], query_embedding / query_norm)
+    
+    # Select the top_k without sorting everything, then order just those
+    if top_k < len(similarities):
+        top_idx = np.argpartition(-similarities, top_k)[:top_k]
+    else:
+        top_idx = np.arange(len(similarities))
+    top_idx = top_idx[np.argsort(-similarities[top_idx], kind="stable")]
     
-    # Sort by similarity (highest first) and return top_k
-    results.sort(key=lambda x: x["similarity"], reverse=True)
-    return results[:top_k]
+    # Text and metadata are read (and metadata parsed) for the winners only
+    return _fetch_chunk_results(db_path, cached["ids"][top_idx], similarities[top_idx])
 
 
 def build_rag_context(query: str, top_k: int = 3, db_path: str = DEFAULT_DB_PATH) -> str:
@@ -0,0 +1,117 @@
+"""
+Approximate nearest-neighbour index over chunk embeddings for soft_batch.
+
+Wraps hnswlib when it's installed. Without it, or while the corpus is small,
+rag falls back to its exact numpy scan. The index is persisted next to the
+database as <db_path>.hnsw, with a JSON sidecar recording the dimension and
+the document_chunks state (chunk count, max id) it reflects.
+"""
+import os
+import json
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+try:
+    import hnswlib  # type: ignore
+except ImportError:
+    hnswlib = None  # type: ignore
+
+
+# Below this many chunks the exact matrix scan is just as fast and never misses
+ANN_MIN_CHUNKS = 5000
+
+# HNSW build/search parameters (graph degree, candidate list sizes)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+Version = Tuple[int, int]
+
+
+def available() -> bool:
+    """True when hnswlib is importable."""
+    return hnswlib is not None
+
+
+def index_path(db_path: str) -> str:
+    return f"{db_path}.hnsw"
+
+
+class ChunkIndex:
+    """
+    HNSW index (cosine space) labelled by document_chunks.id.
+
+    Deletions are soft (mark_deleted) until the index is rebuilt.
+    """
+
+    def __init__(self, index, dim: int, version: Version):
+        self.index = index
+        self.dim = dim
+        self.version = version
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, ids: Sequence[int], version: Version) -> "ChunkIndex":
+        dim = vectors.shape[1]
+        index = hnswlib.Index(space="cosine", dim=dim)
+        index.init_index(
+            max_elements=max(len(ids), 1),
+            ef_construction=HNSW_EF_CONSTRUCTION,
+            M=HNSW_M,
+        )
+        if len(ids):
+            index.add_items(vectors, np.asarray(ids, dtype=np.int64))
+        index.set_ef(HNSW_EF_SEARCH)
+        return cls(index, dim, version)
+
+    @classmethod
+    def load(cls, db_path: str, dim: int) -> Optional["ChunkIndex"]:
+        """Load the persisted index, or None if missing or built for another dim."""
+        path = index_path(db_path)
+        try:
+            with open(f"{path}.json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("dim") != dim or not os.path.exists(path):
+            return None
+
+        index = hnswlib.Index(space="cosine", dim=dim)
+        try:
+            index.load_index(path)
+        except RuntimeError:
+            return None
+        index.set_ef(HNSW_EF_SEARCH)
+        return cls(index, dim, tuple(meta["version"]))
+
+    def save(self, db_path: str) -> None:
+        path = index_path(db_path)
+        self.index.save_index(path)
+        with open(f"{path}.json", "w") as f:
+            json.dump({"dim": self.dim, "version": list(self.version)}, f)
+
+    def add(self, vectors: np.ndarray, ids: Sequence[int]) -> None:
+        if not len(ids):
+            return
+        needed = self.index.get_current_count() + len(ids)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(vectors, np.asarray(ids, dtype=np.int64))
+
+    def remove(self, ids: Sequence[int]) -> None:
+        for chunk_id in ids:
+            try:
+                self.index.mark_deleted(int(chunk_id))
+            except RuntimeError:
+                # Not in the index (e.g. a chunk that failed to embed)
+                continue
+
+    def query(self, vector: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (chunk ids, cosine similarities) of the k nearest chunks, best first.
+        """
+        k = min(k, self.index.get_current_count())
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self.index.set_ef(max(HNSW_EF_SEARCH, k))
+        labels, distances = self.index.knn_query(vector, k=k)
+        return labels[0].astype(np.int64), 1.0 - distances[0]
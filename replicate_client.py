@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import os
+import time
+import asyncio
+from importlib.util import find_spec
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, List, Optional, Union
 
 
 DEFAULT_MODEL_VERSION = (
@@ -12,6 +15,29 @@ DEFAULT_MODEL_VERSION = (
     "04dcb1c60a24e279ad90bf9f34fbc21004f0d8151a67ef5af0e3efa3362028ec"
 )
 
+# Shorter prompts are almost always accidental input; reject them before
+# spending an API call.
+MIN_PROMPT_LENGTH = 10
+
+# Connection pool for the shared client; one image run is a handful of
+# API calls plus the download, so a small keep-alive pool covers it
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+
+# Prediction status polling: start at the caller's interval, back off by this
+# factor while the prediction runs, never waiting longer than the cap
+DEFAULT_POLL_INTERVAL = 0.5
+BATCH_POLL_INTERVAL = 2.0
+POLL_BACKOFF = 1.5
+MAX_POLL_INTERVAL = 10.0
+
+# Images generated at once by generate_image_batch
+DEFAULT_BATCH_CONCURRENCY = 4
+
+_TERMINAL_STATUSES = ("succeeded", "failed", "canceled")
+
+_CLIENT: Optional[Any] = None
+
 
 @dataclass(frozen=True)
 class ReplicateImageResult:
@@ -23,6 +49,97 @@ def _timestamp_slug() -> str:
     return datetime.now().strftime("%Y%m%d-%H%M%S")
 
 
+def _get_client() -> Any:
+    """
+    Return a process-wide replicate.Client so its HTTP connection pool is
+    reused across generate_image calls.
+
+    The transport keeps up to MAX_KEEPALIVE_CONNECTIONS connections alive and
+    speaks HTTP/2 when the optional `h2` package is installed, so polling and
+    downloads share connections instead of repeating TLS handshakes. The
+    transport is synchronous: use client.run, not client.async_run.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        try:
+            import httpx
+            import replicate  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "Missing dependency 'replicate'. Install dependencies with: python -m pip install -r requirements.txt"
+            ) from e
+        transport = httpx.HTTPTransport(
+            http2=find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _CLIENT = replicate.Client(
+            api_token=os.getenv("REPLICATE_API_TOKEN"),
+            transport=transport,
+        )
+    return _CLIENT
+
+
+def _write_output(item: Any, file_path: Path) -> int:
+    """
+    Write a Replicate output to file_path and return the byte count.
+
+    FileOutput is an iterable byte stream: chunks go straight to disk, so the
+    whole image is never held in memory. Older SDK outputs that only offer
+    read() are written in one go. A failed or empty write leaves no file.
+    """
+    if hasattr(item, "__iter__") and not isinstance(item, (str, bytes)):
+        chunks = iter(item)
+    elif hasattr(item, "read"):
+        chunks = iter((item.read(),))
+    else:
+        return 0
+
+    written = 0
+    try:
+        with open(file_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+    if not written:
+        file_path.unlink(missing_ok=True)
+    return written
+
+
+def _run_prediction(client: Any, model_version: str, input_payload: dict[str, Any], poll_interval: float) -> Any:
+    """
+    Create a prediction and poll it to completion with backoff.
+
+    Replaces client.run, whose fixed ~0.5s cadence wastes requests on runs
+    that take tens of seconds. Returns the output with URLs turned into
+    FileOutput objects, like client.run.
+    """
+    from replicate.helpers import transform_output  # type: ignore
+
+    if ":" in model_version or "/" not in model_version:
+        # "owner/name:version" or a bare version id
+        prediction = client.predictions.create(
+            version=model_version.rsplit(":", 1)[-1], input=input_payload
+        )
+    else:
+        prediction = client.models.predictions.create(model=model_version, input=input_payload)
+
+    interval = poll_interval
+    while prediction.status not in _TERMINAL_STATUSES:
+        time.sleep(interval)
+        interval = min(interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
+        prediction.reload()
+
+    if prediction.status != "succeeded":
+        raise RuntimeError(f"Replicate prediction {prediction.status}: {prediction.error}")
+    return transform_output(prediction.output, client)
+
+
 def generate_image(
     *,
     prompt: str,
@@ -38,6 +155,7 @@ def generate_image(
     output_quality: int = 80,
     go_fast: bool = False,
     extra_input: Optional[dict[str, Any]] = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
 ) -> ReplicateImageResult:
     """
     Generate an image via Replicate and write it to disk.
@@ -54,13 +172,10 @@ def generate_image(
     """
     if not prompt or not prompt.strip():
         raise ValueError("prompt is required")
+    if len(prompt.strip()) < MIN_PROMPT_LENGTH:
+        raise ValueError(f"prompt must be at least {MIN_PROMPT_LENGTH} characters")
 
-    try:
-        import replicate  # type: ignore
-    except ImportError as e:
-        raise RuntimeError(
-            "Missing dependency 'replicate'. Install dependencies with: python -m pip install -r requirements.txt"
-        ) from e
+    client = _get_client()
 
     mv = (model_version or os.getenv("REPLICATE_MODEL_VERSION") or DEFAULT_MODEL_VERSION).strip()
     if not mv:
@@ -94,19 +209,59 @@ def generate_image(
     if extra_input:
         input_payload.update(extra_input)
 
-    output = replicate.run(mv, input=input_payload)
+    output = _run_prediction(client, mv, input_payload, poll_interval)
     # Replicate commonly returns a list of file-like outputs
     item = output[0] if isinstance(output, list) and output else output
 
     url: Optional[str] = getattr(item, "url", None)
-    data = item.read() if hasattr(item, "read") else None
-    if not data:
+    if not _write_output(item, file_path):
         raise RuntimeError("Replicate returned no image bytes")
 
-    file_path.write_bytes(data)
     return ReplicateImageResult(path=str(file_path), url=url)
 
 
+
+async def agenerate_image_batch(
+    prompts: List[str],
+    *,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    filename_prefix: str = "replicate",
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    **kwargs: Any,
+) -> List[Union[ReplicateImageResult, Exception]]:
+    """
+    Generate one image per prompt, running up to max_concurrency at once.
+
+    Each generate_image call blocks on the shared sync client, so it runs in
+    a worker thread. Batch runs poll less often by default since nobody is
+    waiting on a single image. Extra kwargs go to generate_image.
+
+    Returns:
+    - One entry per prompt, in order: the result, or the exception it raised
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def one(index: int, prompt: str) -> ReplicateImageResult:
+        async with semaphore:
+            return await asyncio.to_thread(
+                generate_image,
+                prompt=prompt,
+                # Timestamps only have second resolution; keep names distinct
+                filename_prefix=f"{filename_prefix}-{index}",
+                poll_interval=poll_interval,
+                **kwargs,
+            )
+
+    return await asyncio.gather(
+        *(one(i, prompt) for i, prompt in enumerate(prompts, start=1)),
+        return_exceptions=True,
+    )
+
+
+def generate_image_batch(prompts: List[str], **kwargs: Any) -> List[Union[ReplicateImageResult, Exception]]:
+    """Synchronous wrapper around agenerate_image_batch."""
+    return asyncio.run(agenerate_image_batch(prompts, **kwargs))
+
 if __name__ == "__main__":
     # Minimal manual test: python replicate_client.py
     result = generate_image(
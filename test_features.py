@@ -2,20 +2,26 @@
 """
 Test script for new soft_batch features.
 
-Tests chunking, RAG, and database integration.
+Tests chunking, RAG, and database integration. Runs under pytest
+(pip install -r requirements-dev.txt):
+
+    pytest test_features.py            # or: python test_features.py
+    pytest test_features.py -k chunking
+    pytest test_features.py -n auto    # with pytest-xdist installed
+
+The import tests only locate their modules unless SOFT_BATCH_DEEP_IMPORTS=1
+is set (or `python test_features.py --deep`).
 """
 import os
 import sys
+import hashlib
+import importlib
+import importlib.util
 
-def test_chunking():
-    """Test document chunking."""
-    print("\n" + "="*60)
-    print("TEST 1: Document Chunking")
-    print("="*60)
-    
-    from chunking import chunk_document
-    
-    sample_text = """
+import pytest
+
+# Sample documents, built once for every run
+SAMPLE_TEXT = """
 Soft Batch is a modern artisanal bakery focused on creating warm, cozy experiences.
 
 Our Philosophy:
@@ -27,208 +33,386 @@ We're famous for our chocolate chip cookies with a perfectly soft center. Our so
 Community Focus:
 We're more than a bakery. We're a gathering place. Every Sunday, we host baking workshops.
 """.strip()
-    
-    strategies = [
-        ("paragraphs", 200),
-        ("fixed_chars", 150),
-        ("sentences", 3)
-    ]
-    
-    for strategy, size in strategies:
-        print(f"\n  Strategy: {strategy} (size={size})")
-        chunks = chunk_document(sample_text, strategy=strategy, chunk_size=size)
-        print(f"  → Generated {len(chunks)} chunks")
-        
-        if chunks:
-            preview = chunks[0].text[:80].replace('\n', ' ')
-            print(f"  → First chunk: {preview}...")
-    
-    print("\n  ✅ Chunking tests passed!")
-    return True
-
-
-def test_database():
+
+SAMPLE_DOC = """
+Soft Batch uses only organic flour from local mills.
+We bake fresh every morning starting at 5am.
+Our signature item is the chocolate chip cookie with sea salt.
+All our packaging is 100% compostable and eco-friendly.
+""".strip()
+
+
+_BAR60 = "=" * 60
+
+
+def _report_header(title, bar=_BAR60):
+    """Print a test's banner: title between two bars."""
+    print(f"\n{bar}\n{title}\n{bar}")
+
+
+# The database tests use a fresh in-memory database, never the real one. It's
+# shared-cache so init_db()'s own connection builds the schema in the same
+# database, which lives as long as the db_conn fixture's connection stays open.
+# Each pytest-xdist worker is its own process, so gets its own database.
+TEST_DB = "file:soft_batch_test?mode=memory&cache=shared"
+
+# Set SOFT_BATCH_DEEP_IMPORTS=1 to have the import tests really import the
+# modules and look up the symbols instead of only locating them
+DEEP_IMPORTS = os.getenv("SOFT_BATCH_DEEP_IMPORTS") == "1"
+
+
+@pytest.fixture(scope="session")
+def db_conn():
+    """The in-memory test database (schema included), opened once per session."""
+    from database import init_db, connect
+
+    conn = connect(TEST_DB)
+    init_db(TEST_DB)
+    # Throwaway data: no rollback journal on disk, no fsyncs. Already the
+    # case for the in-memory database; keeps it so if TEST_DB becomes a file.
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def sample_text():
+    return SAMPLE_TEXT
+
+
+@pytest.fixture
+def sample_doc():
+    return SAMPLE_DOC
+
+
+def test_chunking(sample_text):
+    """Test document chunking."""
+    _report_header("TEST 1: Document Chunking")
+
+    from chunking import chunk_document
+
+    # Paragraphs: each of the four fits under the limit on its own, and
+    # none can be combined, so they come back one per chunk
+    chunks = chunk_document(sample_text, strategy="paragraphs", chunk_size=200)
+    print(f"  paragraphs (size=200) → {len(chunks)} chunks")
+    assert len(chunks) == 4
+    assert all(len(c.text) <= 200 for c in chunks)
+    assert "\n\n".join(c.text for c in chunks) == sample_text
+
+    # Fixed characters: windows of at most 150 chars, each starting 50 chars
+    # (the overlap) before the previous one ended, covering the whole text
+    chunks = chunk_document(sample_text, strategy="fixed_chars", chunk_size=150, overlap=50)
+    print(f"  fixed_chars (size=150, overlap=50) → {len(chunks)} chunks")
+    assert len(chunks) == 6
+    assert all(len(c.text) <= 150 for c in chunks)
+    assert all(c.text == sample_text[c.start_index:c.end_index].strip() for c in chunks)
+    assert all(b.start_index == a.end_index - 50 for a, b in zip(chunks, chunks[1:]))
+    assert chunks[0].start_index == 0 and chunks[-1].end_index == len(sample_text)
+
+    # Sentences: three per chunk, numbered in order
+    chunks = chunk_document(sample_text, strategy="sentences", chunk_size=3)
+    print(f"  sentences (size=3) → {len(chunks)} chunks")
+    assert len(chunks) == 3
+    assert [c.metadata["sentence_count"] for c in chunks] == [3, 3, 3]
+    assert [c.chunk_number for c in chunks] == [0, 1, 2]
+
+    # Results are cached; callers get copies they can change freely
+    chunks[0].chunk_number = 99
+    assert chunk_document(sample_text, strategy="sentences", chunk_size=3)[0].chunk_number == 0
+
+
+def test_database(db_conn):
     """Test new database tables."""
-    print("\n" + "="*60)
-    print("TEST 2: Database Schema")
-    print("="*60)
-    
-    from database import init_db, get_db, DEFAULT_DB_PATH
-    
-    # Initialize if needed
-    if not os.path.exists(DEFAULT_DB_PATH):
-        print("  Initializing database...")
-        init_db()
-    
+    _report_header("TEST 2: Database Schema")
+
     # Check new tables exist
     new_tables = ['document_chunks', 'notion_documents', 'mastodon_interactions']
-    
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        existing_tables = [row[0] for row in cursor.fetchall()]
-        
-        for table in new_tables:
-            if table in existing_tables:
-                print(f"  ✓ Table '{table}' exists")
-            else:
-                print(f"  ✗ Table '{table}' missing!")
-                return False
-    
-    print("\n  ✅ Database tests passed!")
-    return True
-
-
-def test_rag_mock():
+
+    # Read-only check: look up just the tables we care about, reading the
+    # cursor lazily and stopping once every one has turned up
+    remaining = set(new_tables)
+    db_conn.execute("PRAGMA query_only=1")
+    try:
+        placeholders = ",".join("?" * len(new_tables))
+        cursor = db_conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type='table' AND name IN ({placeholders})",
+            new_tables
+        )
+        for (name,) in cursor:
+            remaining.discard(name)
+            print(f"  ✓ Table '{name}' exists")
+            if not remaining:
+                break
+        cursor.close()
+    finally:
+        db_conn.execute("PRAGMA query_only=0")
+
+    assert not remaining, f"Tables missing: {sorted(remaining)}"
+
+
+def _digest(texts):
+    """blake2b over texts in order; each is length-prefixed so boundaries count."""
+    h = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        data = text.encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.digest()
+
+
+def test_rag_mock(db_conn, sample_doc):
     """Test RAG system with mock data."""
-    print("\n" + "="*60)
-    print("TEST 3: RAG System (Mock)")
-    print("="*60)
-    
+    _report_header("TEST 3: RAG System (Mock)")
+
     from chunking import chunk_document
-    from database import save_document_chunk, get_document_chunks
+    from database import save_document_chunks_bulk, get_document_chunks
     import json
-    
-    sample_doc = """
-Soft Batch uses only organic flour from local mills.
-We bake fresh every morning starting at 5am.
-Our signature item is the chocolate chip cookie with sea salt.
-All our packaging is 100% compostable and eco-friendly.
-""".strip()
-    
+
     # Chunk the document
     print("  Chunking sample document...")
     chunks = chunk_document(sample_doc, strategy="sentences", chunk_size=1)
     print(f"  → Generated {len(chunks)} chunks")
-    
+
     # Save chunks (without embeddings for this test)
     print("  Saving chunks to database...")
     source_id = "test_doc_001"
-    
-    for chunk in chunks:
-        save_document_chunk(
-            source_id=source_id,
-            source_type="test",
-            chunk_text=chunk.text,
-            chunk_number=chunk.chunk_number,
-            chunk_strategy="sentences",
-            metadata=json.dumps(chunk.metadata)
-        )
-    
+
+    # One executemany in one transaction rather than a commit per chunk
+    with db_conn:
+        save_document_chunks_bulk([
+            (source_id, "test", chunk.text, chunk.chunk_number, "sentences", None, json.dumps(chunk.metadata))
+            for chunk in chunks
+        ], conn=db_conn)
+
     # Retrieve chunks
     print("  Retrieving chunks from database...")
-    retrieved = get_document_chunks(source_id, "test")
+    retrieved = get_document_chunks(source_id, "test", conn=db_conn)
     print(f"  → Retrieved {len(retrieved)} chunks")
-    
-    if len(retrieved) == len(chunks):
-        print("  ✓ All chunks stored and retrieved correctly")
-    else:
-        print("  ✗ Chunk count mismatch!")
-        return False
-    
-    print("\n  ✅ RAG tests passed!")
+
+    assert len(retrieved) == len(chunks), "Chunk count mismatch"
+    # Round trip: same texts, in chunk order, as one digest per side
+    assert _digest(chunk.text for chunk in chunks) == _digest(row["chunk_text"] for row in retrieved), \
+        "Retrieved chunk text differs from what was saved"
+    print("  ✓ All chunks stored and retrieved correctly")
     print("  ⚠️  Note: Full embedding tests require OPENROUTER_API_KEY")
-    return True
+
+
+def _check_importable(module_name, names):
+    """
+    Assert module_name can be found (find_spec, no module code runs);
+    with DEEP_IMPORTS, also import it and look up each of names.
+    """
+    print(f"  Locating {module_name}...")
+    assert importlib.util.find_spec(module_name) is not None, f"{module_name} not found"
+    if not DEEP_IMPORTS:
+        print(f"  ✓ {module_name} found")
+        return
+
+    module = importlib.import_module(module_name)
+    for name in names:
+        assert hasattr(module, name), f"{module_name}.{name} missing"
+        print(f"  ✓ {name} imported")
 
 
 def test_listeners_import():
     """Test that listener modules can be imported."""
-    print("\n" + "="*60)
-    print("TEST 4: Listener Modules")
-    print("="*60)
-    
-    try:
-        print("  Importing notion_listener...")
-        from notion_listener import NotionListener
-        print("  ✓ NotionListener imported")
-        
-        print("  Importing mastodon_listener...")
-        from mastodon_listener import MastodonListener
-        print("  ✓ MastodonListener imported")
-        
-        print("\n  ✅ Listener import tests passed!")
-        return True
-    except ImportError as e:
-        print(f"  ✗ Import failed: {e}")
-        return False
+    _report_header("TEST 4: Listener Modules")
+
+    _check_importable("notion_listener", ["NotionListener"])
+    _check_importable("mastodon_listener", ["MastodonListener"])
 
 
 def test_enhanced_llm():
     """Test enhanced LLM functions."""
-    print("\n" + "="*60)
-    print("TEST 5: Enhanced LLM Functions")
-    print("="*60)
-    
-    try:
-        print("  Importing generate_social_post...")
-        from llm import generate_social_post
-        print("  ✓ generate_social_post imported")
-        
-        print("  Importing generate_comment_reply...")
-        from llm import generate_comment_reply
-        print("  ✓ generate_comment_reply imported")
-        
-        print("\n  ✅ LLM enhancement tests passed!")
-        print("  ⚠️  Note: Actual generation requires OPENROUTER_API_KEY")
-        return True
-    except ImportError as e:
-        print(f"  ✗ Import failed: {e}")
-        return False
-
-
-def main():
-    """Run all tests."""
-    print("\n" + "="*70)
-    print(" SOFT BATCH - NEW FEATURES TEST SUITE")
-    print("="*70)
-    
-    tests = [
-        ("Chunking", test_chunking),
-        ("Database", test_database),
-        ("RAG System", test_rag_mock),
-        ("Listeners", test_listeners_import),
-        ("LLM Enhancements", test_enhanced_llm),
+    _report_header("TEST 5: Enhanced LLM Functions")
+
+    _check_importable("llm", ["generate_social_post", "generate_comment_reply"])
+    print("  ⚠️  Note: Actual generation requires OPENROUTER_API_KEY")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"items": []}', '{"items": []}'),
+    ('Sure! Here you go:\n{"items": [{"title": "a}b"}]}\nEnjoy!', '{"items": [{"title": "a}b"}]}'),
+    ('{"a": 1} and also {"b": 2}', '{"a": 1}'),
+    ('   ', None),
+    ('no json here', None),
+    ('{"unterminated": ', None),
+])
+def test_json_extraction(text, expected):
+    """Test JSON object extraction from LLM output."""
+    from llm import _extract_json_object
+
+    assert _extract_json_object(text) == expected
+
+
+def test_article_dedupe():
+    """Test duplicate-story collapsing for RSS articles."""
+    _report_header("TEST 6: Article Deduplication")
+
+    from articles import Article, canonical_url, dedupe_articles
+
+    url = "https://Example.com/sourdough/?utm_source=rss&id=7#comments"
+    print(f"  Canonical URL: {canonical_url(url)}")
+    assert canonical_url(url) == "https://example.com/sourdough?id=7"
+
+    articles = [
+        Article("Sourdough Basics for Total Beginners", "https://example.com/sourdough?utm_medium=feed", "A", "2024-05-02T00:00:00+00:00"),
+        Article("Sourdough basics for total beginners!", "https://other.com/sourdough-basics", "B", "2024-05-01T00:00:00+00:00"),
+        Article("Brown Butter Cookies", "https://example.com/cookies", "A", None),
+        Article("Sourdough Basics", "https://example.com/sourdough/", "C", None),
     ]
-    
-    results = []
-    
-    for test_name, test_func in tests:
-        try:
-            passed = test_func()
-            results.append((test_name, passed))
-        except Exception as e:
-            print(f"\n  ✗ Test failed with exception: {e}")
-            results.append((test_name, False))
-    
-    # Summary
-    print("\n" + "="*70)
-    print(" TEST SUMMARY")
-    print("="*70)
-    
-    passed_count = sum(1 for _, passed in results if passed)
-    total_count = len(results)
-    
-    for test_name, passed in results:
-        status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"  {status} - {test_name}")
-    
-    print(f"\n  Result: {passed_count}/{total_count} tests passed")
-    
-    if passed_count == total_count:
-        print("\n  🎉 All tests passed! Your soft_batch installation is ready.")
-        print("\n  Next steps:")
-        print("    1. Set up environment variables (NOTION_API_KEY, etc.)")
-        print("    2. Run: python main.py sync")
-        print("    3. Run: python main.py (try RAG-enhanced post generation)")
-        print("    4. Optional: Start listeners with python main.py notion-listen")
-    else:
-        print("\n  ⚠️  Some tests failed. Check the output above.")
-    
-    print("="*70 + "\n")
-    
-    return passed_count == total_count
+    deduped = dedupe_articles(articles)
+    print(f"  → {len(articles)} articles collapsed to {len(deduped)}")
+
+    assert [a.source for a in deduped] == ["B", "A"], f"Unexpected result: {deduped}"
+
+    # A recurring short title is a new story each time, not a duplicate
+    series = [
+        Article("Weekend Baking Links", "https://example.com/links/1", "D", "2024-05-04T00:00:00+00:00"),
+        Article("Weekend Baking Links", "https://example.com/links/2", "D", "2024-05-11T00:00:00+00:00"),
+    ]
+    assert dedupe_articles(series) == series
+
+
+class _FakeResponse:
+    status_code = 200
+    headers = {
+        "X-RateLimit-Remaining": "42",
+        "X-RateLimit-Reset": "2030-01-01T00:00:00+00:00",
+    }
+
+    def __init__(self, notifications=()):
+        self._notifications = list(notifications)
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._notifications
+
+
+class _FakeSession:
+    def __init__(self, notifications=()):
+        self.notifications = notifications
+
+    def get(self, url, **kwargs):
+        return _FakeResponse(self.notifications)
+
+
+class _FakeMastodon:
+    """Client whose ratelimit_* attributes are stale, as after a raw request."""
+    access_token = "token"
+    api_base_url = "https://example.social"
+    ratelimit_remaining = 300
+    ratelimit_reset = 0.0
+
+    def __init__(self, notifications=()):
+        self.session = _FakeSession(notifications)
+
+
+def test_conditional_fetch_rate_limit(db_conn, monkeypatch):
+    """Test the conditional notifications fetch counts against the tracked budget."""
+    _report_header("TEST 7: Mastodon Rate Limit Tracking")
+
+    import mastodon_listener
+    from mastodon_client import MastodonRateLimiter
+
+    limiter = MastodonRateLimiter()
+    monkeypatch.setattr(mastodon_listener, "rate_limiter", limiter)
+
+    fetcher = mastodon_listener.MastodonFetcher(_FakeMastodon(), db_path=TEST_DB)
+    assert fetcher.fetch_notifications() == []
+    print(f"  → Remaining budget: {limiter._remaining}")
+
+    # From the response headers, not the client's stale ratelimit_remaining
+    assert limiter._remaining == 42
+
+
+def test_rate_limit_reset_formats():
+    """Test X-RateLimit-Reset is read as epoch or ISO 8601, and junk is ignored."""
+    from mastodon_client import MastodonRateLimiter
+
+    limiter = MastodonRateLimiter()
+    limiter.update({"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1714564800"})
+    assert (limiter._remaining, limiter._reset_at) == (10, 1714564800.0)
+
+    limiter.update({"X-RateLimit-Remaining": "9", "X-RateLimit-Reset": "2024-05-01T12:00:00.000Z"})
+    assert (limiter._remaining, limiter._reset_at) == (9, 1714564800.0)
+
+    # Unparseable values leave the last good reading in place
+    limiter.update({"X-RateLimit-Remaining": "lots", "X-RateLimit-Reset": "soon"})
+    assert (limiter._remaining, limiter._reset_at) == (9, 1714564800.0)
+
+
+def test_cursor_waits_for_store(db_conn, monkeypatch):
+    """Test the notification cursor only moves past mentions that were stored."""
+    _report_header("TEST 8: Mastodon Notification Cursor")
+
+    import sqlite3
+    import mastodon_listener
+    from database import get_listener_state, set_listener_state
+
+    set_listener_state(mastodon_listener.LAST_NOTIFICATION_KEY, None, db_path=TEST_DB)
+    mention = {
+        "id": "5",
+        "type": "mention",
+        "status": {"id": "cursor-test-1", "account": {"acct": "baker"}, "content": "<p>hi</p>"},
+    }
+    fetcher = mastodon_listener.MastodonFetcher(_FakeMastodon([mention]), db_path=TEST_DB)
+
+    def locked(**kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(mastodon_listener, "save_mastodon_interaction", locked)
+        results = fetcher.fetch_once()
+    print(f"  → Failed store: {len(results['errors'])} error(s)")
+    assert results["errors"] and not results["new_interactions"]
+    assert get_listener_state(mastodon_listener.LAST_NOTIFICATION_KEY, db_path=TEST_DB) is None
+
+    results = fetcher.fetch_once()
+    print(f"  → Retry: {len(results['new_interactions'])} stored")
+    assert [i["mastodon_id"] for i in results["new_interactions"]] == ["cursor-test-1"]
+    assert get_listener_state(mastodon_listener.LAST_NOTIFICATION_KEY, db_path=TEST_DB) == "5"
+
+
+def test_claim_lease_expiry(db_conn):
+    """Test claimed interactions aren't handed out again until the lease lapses."""
+    _report_header("TEST 9: Interaction Claim Leases")
+
+    from database import save_mastodon_interaction, claim_unresponded_interactions
+
+    with db_conn:
+        ids = [
+            save_mastodon_interaction(f"lease-test-{n}", "mention", "baker", "hi", conn=db_conn)
+            for n in range(2)
+        ]
+
+    def claim():
+        claimed = claim_unresponded_interactions(limit=1000, lease_seconds=600, db_path=TEST_DB)
+        return sorted(i["id"] for i in claimed if i["id"] in ids)
+
+    assert claim() == sorted(ids)
+    # Leased: a second responder gets nothing
+    assert claim() == []
+    print("  ✓ Claimed rows are leased")
+
+    # One claim lapses (its responder died); only that row is reclaimed
+    with db_conn:
+        db_conn.execute(
+            "UPDATE mastodon_interactions SET processed_at = datetime('now', '-1 hour') WHERE id = ?",
+            (ids[0],)
+        )
+    assert claim() == [ids[0]]
+    print("  ✓ Expired lease reclaimed")
 
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    # `python test_features.py [--deep] [pytest args]` runs this file under pytest
+    args = sys.argv[1:]
+    if "--deep" in args:
+        os.environ["SOFT_BATCH_DEEP_IMPORTS"] = "1"
+        args = [arg for arg in args if arg != "--deep"]
+    sys.exit(pytest.main([__file__, *args]))